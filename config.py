@@ -14,6 +14,10 @@ DEADZONE = 0.7
 RELEASE_TIMEOUT = 0.15
 POLLING_INTERVAL = 20  # ms (was likely 50 or higher)
 UDP_SEND_INTERVAL = 20  # ms (was likely 50 or higher)
+IDLE_POLLING_INTERVAL = 60  # ms; poll rate once no input has changed for IDLE_AFTER_TICKS ticks
+IDLE_AFTER_TICKS = 100  # ~2 s at POLLING_INTERVAL
+AUTOSAVE_DELAY = 500  # ms; mapping edits within this window share one auto-save
+DETECTION_POLL_INTERVAL = 50  # ms; how often the UI checks for an input detection result
 
 # UI Theme Configuration
 class ThemeConfig:
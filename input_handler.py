@@ -5,6 +5,7 @@ Handles joystick/gamepad device detection, management, and input processing.
 """
 
 import pygame
+import re
 import time
 import threading
 from typing import Dict, List, Tuple, Optional, Any
@@ -18,6 +19,9 @@ logger = logging.getLogger(__name__)
 DEADZONE = 0.7
 RELEASE_TIMEOUT = 0.15
 
+# Device-name fragments that identify a Thrustmaster device in scan logs and summaries
+THRUSTMASTER_NAME_RE = re.compile(r'thrustmaster|tm |t16000|twcs|hotas', re.IGNORECASE)
+
 
 class InputDevice:
     """Represents a connected input device with enhanced Thrustmaster support"""
@@ -37,6 +41,8 @@ class InputDevice:
         self.enabled = False
         self.is_thrustmaster = self._detect_thrustmaster()
         self._cached_info = None
+        # Prebuilt (device_id, input_type, index) keys per input kind, see get_input_keys
+        self._input_keys: Optional[Tuple[Tuple, Tuple, Tuple]] = None
         
     def _detect_thrustmaster(self) -> bool:
         """Detect if this is a Thrustmaster device"""
@@ -137,6 +143,24 @@ class InputDevice:
             return self.joystick.get_numhats()
         except Exception:
             return 0
+    
+    def get_input_keys(self) -> Tuple[Tuple, Tuple, Tuple]:
+        """
+        Get the (device_id, input_type, index) keys of every button, axis and hat
+        
+        Returns:
+            (button_keys, axis_keys, hat_keys), rebuilt only when the input counts change
+        """
+        counts = (self.get_button_count(), self.get_axis_count(), self.get_hat_count())
+        keys = self._input_keys
+        if keys is None or tuple(map(len, keys)) != counts:
+            device_id = self.device_id
+            keys = tuple(
+                tuple((device_id, input_type, i) for i in range(count))
+                for input_type, count in zip(('Button', 'Axis', 'Hat'), counts)
+            )
+            self._input_keys = keys
+        return keys
 
 
 class InputManager:
@@ -148,10 +172,14 @@ class InputManager:
         self.enabled_devices: List[int] = []
         self.input_states: Dict[Tuple, Any] = {}
         self.last_input_time = 0
-        self.waiting_for_input = False
         self.input_detected_callback = None
         self.detection_lock = threading.Lock()
         self.detection_active = False
+        # Set while detect_input is polling; read from other threads via waiting_for_input
+        self._detect_in_progress = threading.Event()
+        # Set by cancel_input_detection; detect_input waits on it between polls,
+        # so a cancel ends the detection at once instead of after the timeout
+        self._detect_cancel = threading.Event()
         
         # Initialize pygame
         try:
@@ -202,8 +230,7 @@ class InputManager:
                     logger.info(f"Processing device {i}: '{device_name}'")
                     
                     # Check if it's a Thrustmaster device and log accordingly
-                    is_thrustmaster = any(tm_indicator in device_name.lower() 
-                                        for tm_indicator in ['thrustmaster', 'tm ', 't16000', 'twcs', 'hotas'])
+                    is_thrustmaster = THRUSTMASTER_NAME_RE.search(device_name) is not None
                     if is_thrustmaster:
                         logger.info(f"🎯 Thrustmaster device detected: {device_name}")
                     
@@ -233,8 +260,7 @@ class InputManager:
             if self.devices:
                 logger.info("Registered devices summary:")
                 for device_id, device in self.devices.items():
-                    device_type = "Thrustmaster" if any(tm in device.name.lower() 
-                                                      for tm in ['thrustmaster', 'tm ', 't16000', 'twcs', 'hotas']) else "Generic"
+                    device_type = "Thrustmaster" if THRUSTMASTER_NAME_RE.search(device.name) else "Generic"
                     logger.info(f"  Device {device_id}: {device.name} ({device_type})")
             
             return list(self.devices.values())
@@ -306,12 +332,13 @@ class InputManager:
                 logger.info("Input detection already in progress, skipping new request")
                 return None
             self.detection_active = True
+            self._detect_cancel.clear()
         
         try:
             if not self.enabled_devices:
                 return None
             
-            self.waiting_for_input = True
+            self._detect_in_progress.set()
             start_time = time.time()
             
             # Store baseline states immediately (no initial delay)
@@ -338,7 +365,8 @@ class InputManager:
                     movement_detected[device_id][f'axis_{i}'] = False
             
             # Small delay to let any residual input settle
-            time.sleep(0.1)
+            if self._detect_cancel.wait(0.1):
+                return None
             
             # Re-establish baseline after brief settling
             for device_id in self.enabled_devices:
@@ -421,12 +449,14 @@ class InputManager:
                             logger.info(f"Hat {i} moved on device {device_id}")
                             return (device_id, 'Hat', i)
                 
-                time.sleep(0.01)  # Smaller delay for more responsive detection
+                # Smaller delay for more responsive detection; wakes early on cancel
+                if self._detect_cancel.wait(0.01):
+                    return None
                 
         except Exception as e:
             logger.error(f"Error during input detection: {e}")
         finally:
-            self.waiting_for_input = False
+            self._detect_in_progress.clear()
             with self.detection_lock:
                 self.detection_active = False
         
@@ -443,6 +473,8 @@ class InputManager:
             return []
         
         inputs = []
+        append = inputs.append
+        input_states = self.input_states
         
         try:
             pygame.event.pump()
@@ -454,35 +486,48 @@ class InputManager:
                 if not device.enabled:
                     continue
                 
-                # Process buttons
-                for i in range(device.get_button_count()):
-                    value = device.joystick.get_button(i)
-                    key = (device_id, 'Button', i)
-                    if key not in self.input_states or self.input_states[key] != value:
-                        self.input_states[key] = value
-                        inputs.append((device_id, 'Button', i, value))
+                # State keys are prebuilt per device, so sampling an input that did
+                # not change allocates nothing
+                button_keys, axis_keys, hat_keys = device.get_input_keys()
+                joystick = device.joystick
                 
-                # Process axes
-                for i in range(device.get_axis_count()):
-                    value = device.joystick.get_axis(i)
-                    key = (device_id, 'Axis', i)
-                    if key not in self.input_states or abs(self.input_states[key] - value) > 0.01:
-                        self.input_states[key] = value
-                        inputs.append((device_id, 'Axis', i, value))
+                # Process buttons: only transitions are emitted, so unchanged
+                # buttons never reach the mapping layer
+                get_button = joystick.get_button
+                for key in button_keys:
+                    value = get_button(key[2])
+                    if input_states.get(key) != value:
+                        input_states[key] = value
+                        append((device_id, 'Button', key[2], value))
+                
+                # Process axes: read the whole device in one pass, then diff
+                # against the previous sample with a single dict probe per axis
+                get_axis = joystick.get_axis
+                axis_values = [get_axis(key[2]) for key in axis_keys]
+                for key, value in zip(axis_keys, axis_values):
+                    previous = input_states.get(key)
+                    if previous is None or abs(previous - value) > 0.01:
+                        input_states[key] = value
+                        append((device_id, 'Axis', key[2], value))
                 
                 # Process hats
-                for i in range(device.get_hat_count()):
-                    value = device.joystick.get_hat(i)
-                    key = (device_id, 'Hat', i)
-                    if key not in self.input_states or self.input_states[key] != value:
-                        self.input_states[key] = value
-                        inputs.append((device_id, 'Hat', i, value))
+                get_hat = joystick.get_hat
+                for key in hat_keys:
+                    value = get_hat(key[2])
+                    if input_states.get(key) != value:
+                        input_states[key] = value
+                        append((device_id, 'Hat', key[2], value))
                         
         except Exception as e:
             logger.error(f"Error processing inputs: {e}")
         
         return inputs
     
+    @property
+    def waiting_for_input(self) -> bool:
+        """True while detect_input is polling the devices for an input"""
+        return self._detect_in_progress.is_set()
+    
     def cancel_input_detection(self) -> bool:
         """
         Cancel ongoing input detection
@@ -492,7 +537,7 @@ class InputManager:
         """
         with self.detection_lock:
             if self.detection_active:
-                self.waiting_for_input = False
+                self._detect_cancel.set()
                 logger.info("Input detection cancelled")
                 return True
             return False
@@ -505,7 +550,8 @@ class InputManager:
             # Stop any ongoing input detection
             with self.detection_lock:
                 if self.detection_active:
-                    self.waiting_for_input = False
+                    # Wake detect_input so it stops polling devices we are about to release
+                    self._detect_cancel.set()
                     self.detection_active = False
                     logger.info("Stopped active input detection")
             
@@ -23,19 +23,84 @@ import logging
 import os
 import sys
 import json
-from typing import Optional, Dict, Any
+import queue
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Set, Tuple
 
-from config import DEFAULT_IP, DEFAULT_PORT, POLLING_INTERVAL, UDP_SEND_INTERVAL, FunctionMapping
+from config import (DEFAULT_IP, DEFAULT_PORT, POLLING_INTERVAL, UDP_SEND_INTERVAL, AUTOSAVE_DELAY,
+                    IDLE_POLLING_INTERVAL, IDLE_AFTER_TICKS, DETECTION_POLL_INTERVAL, FunctionMapping)
 from networking import UDPClient
-from input_handler import InputManager
-from mapping_logic import InputMapper
+from input_handler import InputManager, THRUSTMASTER_NAME_RE
+from mapping_logic import InputMapper, REVERSER_3WAY_FUNCTIONS, REVERSER_3WAY_POSITIONS
 from ui_components import UIManager
-from utils import PeriodicTimer, StateTracker, format_input_display, setup_logging
+from utils import (StateTracker, pin_current_thread, format_input_display, setup_logging, shutdown_logging,
+                   begin_high_resolution_timer, end_high_resolution_timer)
 
 # Setup logging
 setup_logging(level="INFO")
 logger = logging.getLogger(__name__)
 
+# Highest Run8 function id; sizes the per-function command table
+MAX_FUNCTION_ID = max(function_id for _, function_id in FunctionMapping.FUNCTIONS)
+
+# Function names in display order
+_FUNCTION_NAMES = tuple(name for name, _ in FunctionMapping.FUNCTIONS)
+
+# Reverser 3-way mapping rows, and the names prompts use for them
+_REVERSER_3WAY_ROWS = tuple(REVERSER_3WAY_FUNCTIONS.items())  # (position, row name)
+_REVERSER_ROW_LABELS = {name: f"Reverser {pos.capitalize()}" for pos, name in _REVERSER_3WAY_ROWS}
+
+# Roles an input can play in the combined throttle/dyn fast path of the poll loop
+_ROLE_COMBINED_LEVER, _ROLE_TOGGLE_BUTTON = range(2)
+
+# Mapping prompt templates; the "press an input" prompts are formatted once per row
+_PROMPT_READY = "Ready - now move/press the input for '{}' (5 second timeout)..."
+_PROMPT_PRESS_SWITCH = "Press the button/switch for '{}' (5 second timeout)..."
+_PROMPT_MAPPED = "Successfully mapped '{}' to {}"
+_PROMPT_FAILED = "Failed to map '{}'"
+_PROMPT_DETECT_ERROR = "Error during input detection: {}"
+_MAP_PROMPTS = {name: _PROMPT_READY.format(name) for name in _FUNCTION_NAMES}
+_MAP_PROMPTS.update((name, _PROMPT_PRESS_SWITCH.format(label)) for name, label in _REVERSER_ROW_LABELS.items())
+_REVERSER_LEVER_SWITCH_PROMPT = ("Press the button/switch for 'Reverser Lever' in 3-position switch mode "
+                                 "(5 second timeout)...")
+
+# Input mapping validation: each function's required input kind (default 'toggle'),
+# the detected input type that kind accepts, and the message shown on a mismatch
+_REQUIRED_INPUT_KINDS = {name: kind.lower() for name, kind in FunctionMapping.INPUT_TYPES.items()}
+# Functions whose rows carry a reverse axis checkbox
+_LEVER_FUNCTIONS = frozenset(name for name, kind in _REQUIRED_INPUT_KINDS.items() if kind == 'lever')
+_ALLOWED_INPUT_TYPES = {
+    'lever': 'axis',
+    'momentary': 'button',
+    'toggle': 'button',
+    '3way': 'button',
+    '4way': 'button',
+}
+_INPUT_TYPE_ERRORS = {
+    'axis': "'{}' can only be mapped to an axis/lever input. Please try again with an axis input.",
+    'button': "'{}' can only be mapped to a button/switch input. Please try again with a button input.",
+}
+
+
+# Detected input types as InputManager.detect_input spells them
+_DETECTED_TYPE_NAMES = {'axis': 'Axis', 'button': 'Button'}
+
+
+def _input_rule(function_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """(accepted detected input type, error message) for a function; (None, None) accepts anything"""
+    allowed = _ALLOWED_INPUT_TYPES.get(_REQUIRED_INPUT_KINDS.get(function_name, 'toggle'))
+    if allowed is None:
+        return None, None
+    return _DETECTED_TYPE_NAMES[allowed], _INPUT_TYPE_ERRORS[allowed].format(function_name)
+
+
+# Every mappable row's validation rule, resolved once; reverser 3-way positions take buttons only
+_INPUT_RULES = {name: _input_rule(name) for name in _FUNCTION_NAMES}
+_INPUT_RULES.update((name, ('Button', "Reverser 3-way positions can only be mapped to buttons/switches. "
+                                      "Please try again with a button input."))
+                    for name in REVERSER_3WAY_FUNCTIONS.values())
+
 
 class Run8ControlConductor:
     def toggle_throttle_mode(self, mode: str) -> None:
@@ -56,6 +121,9 @@ class Run8ControlConductor:
         # Initialize modules
         self.udp_client = UDPClient()
         self.input_manager = InputManager()
+        # Resolved once: what this InputManager supports, so clicks don't re-probe it
+        self._can_cancel_detection = callable(getattr(self.input_manager, 'cancel_input_detection', None))
+        self._has_detection_active = hasattr(self.input_manager, 'detection_active')
         self.input_mapper = InputMapper()
         self.ui_manager = UIManager(self.root)
         self.state_tracker = StateTracker()
@@ -63,24 +131,76 @@ class Run8ControlConductor:
         # Initialize application state
         self.running = False
         self.input_thread: Optional[threading.Thread] = None
-        self.input_timer: Optional[PeriodicTimer] = None
-        self.udp_timer: Optional[PeriodicTimer] = None
+        # Dedicated UDP sender so socket I/O never stalls the poll timer
+        self.sender_thread: Optional[threading.Thread] = None
+        self._send_q: queue.SimpleQueue = queue.SimpleQueue()
+        # Persistent input-detection worker, fed (serial, function name) requests by
+        # map_input. It never touches Tk: results go into _detection_result_q, which the
+        # Tk thread polls, and a cancelled request's result is dropped instead of delivered.
+        # Results carry their request serial so a late one can't answer a newer request
+        self._detect_q: queue.SimpleQueue = queue.SimpleQueue()
+        self._detect_serial = 0  # Serial of the latest map_input request (Tk thread only)
+        self._detection_result_q: queue.Queue = queue.Queue(maxsize=1)
+        self._detection_cancel = threading.Event()
+        self._detection_poll_id: Optional[str] = None
+        self._detect_thread = threading.Thread(target=self._detect_worker, daemon=True)
+        self._detect_thread.start()
+        # Tk after() id of the next poll tick; ticks run on the Tk thread
+        self._input_after_id: Optional[str] = None
+        self._next_tick = 0.0  # Monotonic deadline of the next poll tick (seconds)
+        self._idle_ticks = 0  # Consecutive ticks without any input change
+        # UDP sends piggyback on every Nth poll tick instead of a second timer
+        self._send_divider = max(1, UDP_SEND_INTERVAL // POLLING_INTERVAL)
+        self._send_counter = 0
+
+        # Pending after_idle display refresh (see update_mapping_displays)
+        self._refresh_scheduled = False
+        self._display_errors_logged: set = set()  # Functions whose display failed (logged once)
 
-        # Input detection state
+        # Input detection state (Tk thread only)
         self.waiting_for_input = False
         self.input_target_function: Optional[str] = None
-        self.pending_commands: Dict[int, int] = {}  # function_id -> value
+        # Double-buffered command state: latest value per function_id (-1 = nothing queued)
+        # plus the list of function_ids queued since the last drain, in first-queued order.
+        # The poll tick writes the "write" pair; a send tick swaps it with the "read" pair,
+        # which the sender thread drains. Both pairs are reused, so nothing is reallocated.
+        self._cmd_values = array('i', [-1]) * (MAX_FUNCTION_ID + 1)
+        self._cmd_dirty: List[int] = []
+        self._cmd_read_values = array('i', [-1]) * (MAX_FUNCTION_ID + 1)
+        self._cmd_read_dirty: List[int] = []
+        self._cmd_lock = threading.Lock()  # Guards the swap and _cmd_read_pending
+        self._cmd_read_pending = False  # Read pair handed to the sender, not yet drained
+        # Sender thread's reused copy of a drained read buffer (ids and values, in order)
+        self._send_ids = array('i')
+        self._send_values = array('i')
+
+        # Reverser mode (default to axis), the one copy of it on this side; read it through
+        # reverser_mode and change it only through _set_reverser_mode
+        self._reverser_mode = 'axis'
+
+        # Throttle mode mirrored here so the poll loop never reads Tk variables
+        self._cached_throttle_mode = 'separate'
+        self._combined_mode = False  # throttle mode is 'toggle' or 'split'
 
-        # Reverser mode (default to axis)
-        self.reverser_switch_mode = False
+        # Tk after() id of the periodic reverser resend (2-way/3-way switch modes only)
+        self._reverser_after_id: Optional[str] = None
 
         # Combined throttle/dyn mode state
-        self.combined_toggle_state = False  # False=Throttle, True=Dynamic
-        self.last_toggle_button_state = False  # Track button state for edge detection
+        self.combined_toggle_state = 0  # 0=Throttle, 1=Dynamic
+        self.last_toggle_button_state = 0  # Track button state (0/1) for edge detection
 
         # Auto-save settings
         self.auto_save_enabled = True
         self.auto_save_file = self._get_auto_save_file_path()
+        # Debounced auto-save: each edit re-arms one Tk timer, which snapshots the
+        # mappings AUTOSAVE_DELAY after the last change; a background worker writes the CSV
+        self._autosave_after_id: Optional[str] = None
+        self._autosave_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        # Reverse checkboxes push into the mapper as they are clicked; this only holds
+        # functions whose mapper flag was dropped while the checkbox kept its state
+        self._dirty_reverse_axis: Set[str] = set()
+        # input_mapper.mapping_version last written to the auto-save file (-1 = none yet)
+        self._autosaved_version = -1
 
         # Setup UI callbacks
         self._setup_ui_callbacks()
@@ -92,6 +212,11 @@ class Run8ControlConductor:
         # Initialize throttle mode sync
         initial_throttle_mode = self.ui_manager.get_throttle_mode()
         self.input_mapper.set_throttle_mode(initial_throttle_mode)
+        self._sync_cached_throttle_mode()
+
+        # Build the mapping widgets once; the function list never changes (throttle
+        # mode changes re-lay them out from inside the UI manager)
+        self.ui_manager.populate_mapping_interface(_FUNCTION_NAMES)
 
         # Load persistent mappings automatically and refresh devices
         self._load_persistent_mappings()
@@ -112,21 +237,64 @@ class Run8ControlConductor:
         self.ui_manager.set_clear_mapping_callback(self.clear_mapping)
         self.ui_manager.set_reverser_mode_callback(self.toggle_reverser_mode)
         self.ui_manager.set_throttle_mode_callback(self.toggle_throttle_mode)
+        self.ui_manager.set_reverse_axis_callback(self.on_reverse_axis_toggle)
+        # Mirror the throttle mode variable on every write, including programmatic sets
+        self.ui_manager.trace_throttle_mode_var(self._sync_cached_throttle_mode)
+    
+    @staticmethod
+    def _get_app_dir() -> str:
+        """Directory of the running executable or script"""
+        # Handle both script and executable environments
+        if getattr(sys, 'frozen', False):
+            # Running as executable
+            return os.path.dirname(sys.executable)
+        # Running as script
+        return os.path.dirname(os.path.abspath(__file__))
+    
+    @staticmethod
+    def _get_user_data_dir() -> str:
+        """Per-user settings directory (not created here)"""
+        import platform
+        if platform.system() == 'Windows':
+            appdata_dir = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+            return os.path.join(appdata_dir, 'Run8ControlConductor')
+        # For non-Windows systems
+        return os.path.join(os.path.expanduser('~'), '.run8controlconductor')
     
     def _get_auto_save_file_path(self) -> str:
-        """Get the appropriate auto-save file path for persistent mappings"""
+        """Get the auto-save file path, reusing a user data directory fallback remembered from the last run"""
+        app_dir = self._get_app_dir()
+        user_data_dir = self._get_user_data_dir()
+        sidecar = os.path.join(user_data_dir, 'autosave_path.json')
+        
+        # Only a fallback to the user data directory is remembered, so portable installs
+        # never touch the user profile; their app directory is write-probed on every start
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                remembered = json.load(f)
+            auto_save_file = remembered['path']
+            # A portable install that moved must re-resolve against its new directory
+            if remembered.get('app_dir') == app_dir and os.path.dirname(auto_save_file) == user_data_dir:
+                logger.debug(f"Using remembered auto-save path: {auto_save_file}")
+                return auto_save_file
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        auto_save_file = self._resolve_auto_save_file_path(app_dir)
+        if os.path.dirname(auto_save_file) == user_data_dir:
+            # The app directory failed the write probe; skip it next time
+            try:
+                with open(sidecar, 'w', encoding='utf-8') as f:
+                    json.dump({'app_dir': app_dir, 'path': auto_save_file}, f)
+            except OSError as e:
+                logger.debug(f"Could not remember auto-save path: {e}")
+        return auto_save_file
+    
+    def _resolve_auto_save_file_path(self, app_dir: str) -> str:
+        """Pick the auto-save file path by probing the candidate directories"""
         try:
             # Try to use the application directory first (for portable installs)
-            # Handle both script and executable environments
-            if getattr(sys, 'frozen', False):
-                # Running as executable
-                app_dir = os.path.dirname(sys.executable)
-                logger.debug(f"Running as executable, app directory: {app_dir}")
-            else:
-                # Running as script
-                app_dir = os.path.dirname(os.path.abspath(__file__))
-                logger.debug(f"Running as script, app directory: {app_dir}")
-                
+            logger.debug(f"App directory: {app_dir}")
             auto_save_file = os.path.join(app_dir, 'auto_mappings.csv')
             
             # Test if we can write to the application directory
@@ -149,13 +317,7 @@ class Run8ControlConductor:
         
         # Fall back to user's AppData/Local directory
         try:
-            import platform
-            if platform.system() == 'Windows':
-                appdata_dir = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
-                app_data_dir = os.path.join(appdata_dir, 'Run8ControlConductor')
-            else:
-                # For non-Windows systems
-                app_data_dir = os.path.join(os.path.expanduser('~'), '.run8controlconductor')
+            app_data_dir = self._get_user_data_dir()
             
             # Create directory if it doesn't exist
             os.makedirs(app_data_dir, exist_ok=True)
@@ -177,6 +339,8 @@ class Run8ControlConductor:
             if os.path.exists(self.auto_save_file):
                 logger.info(f"Loading persistent mappings from: {self.auto_save_file}")
                 self.load_mappings(self.auto_save_file)
+                # The auto-save file already holds exactly what was just loaded
+                self._autosaved_version = self.input_mapper.mapping_version
                 # Verify the mappings were loaded
                 loaded_mappings = self.input_mapper.get_all_mappings()
                 logger.info(f"Persistent mappings loaded successfully: {len(loaded_mappings)} mappings")
@@ -198,7 +362,7 @@ class Run8ControlConductor:
                         logger.info(f"Importing legacy mappings from: {legacy_file}")
                         self.load_mappings(legacy_file)
                         # Auto-save the imported mappings for future use
-                        self._auto_save_mappings()
+                        self._schedule_autosave()
                         legacy_file_found = True
                         break
                 
@@ -211,56 +375,163 @@ class Run8ControlConductor:
             # Fall back to default behavior
             self.load_mappings()
     
+    def _schedule_autosave(self) -> None:
+        """Request an auto-save AUTOSAVE_DELAY after the last edit; a burst of edits shares one write"""
+        if not self.auto_save_enabled:
+            return
+        if self._autosave_after_id is not None:
+            self.root.after_cancel(self._autosave_after_id)
+        self._autosave_after_id = self.root.after(AUTOSAVE_DELAY, self._do_autosave)
+    
+    def _cancel_autosave(self) -> bool:
+        """Cancel a scheduled auto-save; returns True if one was pending"""
+        if self._autosave_after_id is None:
+            return False
+        self.root.after_cancel(self._autosave_after_id)
+        self._autosave_after_id = None
+        return True
+    
+    def _do_autosave(self) -> None:
+        """Tk timer callback: snapshot the mappings and hand the write to the autosave worker"""
+        self._autosave_after_id = None
+        snapshot = self._prepare_auto_save()
+        if snapshot is not None:
+            self._autosave_executor.submit(self._write_auto_save, snapshot)
+    
     def _auto_save_mappings(self) -> None:
-        """Automatically save current mappings to the persistent file"""
+        """Queue an auto-save right away instead of after AUTOSAVE_DELAY (used on shutdown)"""
         if not self.auto_save_enabled:
             return
-            
+        self._cancel_autosave()
+        self._do_autosave()
+    
+    def _write_auto_save(self, snapshot: Dict[str, Any]) -> None:
+        """Write a mapping snapshot to the persistent file; safe to run off the Tk thread"""
         try:
-            # Update reverse axis settings from UI before saving
-            for function_name in self.input_mapper.get_mapped_functions():
-                if function_name == "Reverser Lever" and self.reverser_switch_mode:
-                    # Skip reverse axis setting for reverser in switch mode
-                    continue
-                    
-                reverse_setting = self.ui_manager.get_reverse_axis_setting(function_name)
-                self.input_mapper.set_axis_reverse(function_name, reverse_setting)
-            
-            # Ensure the input mapper has the correct reverser mode before saving
-            if self.reverser_switch_mode:
-                # Determine if it's 2way or 3way mode
-                if getattr(self.input_mapper, 'reverser_two_input_mode', False):
-                    mode = '2way'
-                else:
-                    mode = '3way'
-            else:
-                mode = 'axis'
-            
-            # Set the mode in the input mapper to ensure consistency
-            self.input_mapper.set_reverser_switch_mode(mode)
-            
-            # Perform the auto-save
-            if self.input_mapper.save_mappings(self.auto_save_file):
+            if self.input_mapper.write_mappings_snapshot(snapshot, self.auto_save_file):
+                self._autosaved_version = snapshot['version']
                 logger.debug(f"Auto-saved mappings to: {self.auto_save_file}")
             else:
                 logger.warning("Failed to auto-save mappings")
+        except Exception as e:
+            logger.error(f"Error during auto-save: {e}")
+    
+    def _sync_dirty_reverse_axis(self) -> None:
+        """Re-push the checkbox state of functions whose mapper reverse flag was dropped;
+        functions that are still unmapped stay pending until they are mapped again"""
+        if not self._dirty_reverse_axis:
+            return
+        get_setting = self.ui_manager.get_reverse_axis_setting
+        function_input_map = self.input_mapper.function_input_map
+        synced = [name for name in self._dirty_reverse_axis if name in function_input_map]
+        for function_name in synced:
+            self.input_mapper.set_axis_reverse(function_name, get_setting(function_name))
+        self._dirty_reverse_axis.difference_update(synced)
+    
+    def _check_reverse_axis_sync(self) -> None:
+        """Debug-only check that the mapper's reverse flags match the checkboxes"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        for function_name in self.input_mapper.get_mapped_functions():
+            if function_name == "Reverser Lever" and self.reverser_mode != 'axis':
+                continue
+            if self.ui_manager.get_reverse_axis_setting(function_name) != self.input_mapper.get_axis_reverse(function_name):
+                logger.debug("Reverse axis out of sync for %s", function_name)
+    
+    def _prepare_auto_save(self) -> Optional[Dict[str, Any]]:
+        """Sync UI-held settings into the input mapper and snapshot it for saving
+        
+        Returns None when there is nothing to write: unchanged since the last auto-save, or an error
+        """
+        try:
+            self._sync_dirty_reverse_axis()
+            self._check_reverse_axis_sync()
+            
+            if self.input_mapper.mapping_version == self._autosaved_version:
+                logger.debug("Mappings unchanged since last auto-save; skipping")
+                return None
+            return self.input_mapper.get_mappings_snapshot()
                 
         except Exception as e:
             logger.error(f"Error during auto-save: {e}")
+            return None
+    
+    @property
+    def reverser_mode(self) -> str:
+        """Current reverser mode: 'axis', '2way', or '3way'"""
+        return self._reverser_mode
+    
+    def _set_reverser_mode(self, mode: str) -> None:
+        """Set the reverser mode here and in the input mapper, keeping both in step,
+        and re-arm the periodic reverser resend when the mode changes
+        Args:
+            mode: 'axis', '2way', or '3way'
+        """
+        self.input_mapper.set_reverser_switch_mode(mode)
+        if mode != self._reverser_mode:
+            self._reverser_mode = mode
+            self._schedule_reverser_resend()
     
     def toggle_reverser_mode(self, mode: str) -> None:
         """Toggle between axis, 2-way, and 3-way switch mode for the reverser
         Args:
             mode: 'axis', '2way', or '3way'
         """
-        self.reverser_switch_mode = (mode != 'axis')
+        self._set_reverser_mode(mode)
         logger.info(f"Reverser mode set to: {mode}")
-        # Update the input mapper with the new mode
-        self.input_mapper.set_reverser_switch_mode(mode)
         # Update the UI to reflect the current mode
         self.ui_manager.set_reverser_mode(mode)
         # Auto-save the settings change
-        self._auto_save_mappings()
+        self._schedule_autosave()
+    
+    def _sync_cached_throttle_mode(self) -> None:
+        """Copy the UI's throttle mode into the cache read by the poll loop
+        (reverser mode changes all go through _set_reverser_mode)"""
+        throttle_mode = self.ui_manager.get_throttle_mode()
+        self._cached_throttle_mode = throttle_mode
+        self._combined_mode = throttle_mode in ("toggle", "split")
+    
+    def _schedule_reverser_resend(self) -> None:
+        """(Re)arm the periodic reverser resend for the current reverser mode"""
+        if self._reverser_after_id is not None:
+            self.root.after_cancel(self._reverser_after_id)
+            self._reverser_after_id = None
+        mode = self.reverser_mode
+        if self.running and mode in ("2way", "3way"):
+            # 2-way switches resend more often; the interval comes from the Tk scheduler
+            interval = 250 if mode == "2way" else 500
+            self._reverser_after_id = self.root.after(interval, self._emit_reverser_periodic, interval)
+    
+    def _emit_reverser_periodic(self, interval: int) -> None:
+        """Tk timer callback: requeue the current reverser position and reschedule"""
+        self._reverser_after_id = None
+        if not self.running:
+            return
+        self._queue_reverser_state()
+        self._reverser_after_id = self.root.after(interval, self._emit_reverser_periodic, interval)
+    
+    def _queue_reverser_state(self) -> Optional[int]:
+        """
+        Queue the Reverser Lever command for the mapper's current switch position
+        
+        Returns:
+            The queued value, or None if there is no Reverser Lever function id
+        """
+        im = self.input_mapper
+        function_id = im.reverser_fid
+        if not function_id:
+            return None
+        value = im.reverser_positions.get(im.reverser_state, 127)
+        self._queue_command(function_id, value)
+        return value
+    
+    def on_reverse_axis_toggle(self, function_name: str, reverse: bool) -> None:
+        """Push a reverse checkbox change straight into the input mapper
+        Args:
+            function_name: Function whose reverse checkbox changed
+            reverse: New checkbox state
+        """
+        self.input_mapper.set_axis_reverse(function_name, reverse)
     
     def start_application(self) -> None:
         """Start the input processing and UDP communication"""
@@ -290,7 +561,11 @@ class Run8ControlConductor:
             self.ui_manager.show_message("Error", "Failed to connect UDP client", "error")
             return
         
-        # Start input processing
+        # Only dispatch inputs from devices that are actually enabled
+        self.input_mapper.set_enabled_devices(self.input_manager.enabled_devices)
+        
+        # Start input processing (with 1 ms scheduler resolution on Windows)
+        begin_high_resolution_timer()
         self.running = True
         self.start_input_processing()
         
@@ -311,6 +586,7 @@ class Run8ControlConductor:
         # Stop input processing
         self.running = False
         self.stop_input_processing()
+        end_high_resolution_timer()
         
         # Disconnect UDP client
         self.udp_client.disconnect()
@@ -323,21 +599,18 @@ class Run8ControlConductor:
         logger.info("Application stopped")
     
     def start_input_processing(self) -> None:
-        """Start input processing timers"""
+        """Start the input processing timer"""
         try:
-            # Start input polling timer
-            self.input_timer = PeriodicTimer(
-                POLLING_INTERVAL / 1000.0,  # Convert ms to seconds
-                self.process_inputs
-            )
-            self.input_timer.start()
+            # Start UDP sender thread before the first tick can queue anything
+            self.sender_thread = threading.Thread(target=self._sender_loop, daemon=True)
+            self.sender_thread.start()
             
-            # Start UDP send timer
-            self.udp_timer = PeriodicTimer(
-                UDP_SEND_INTERVAL / 1000.0,  # Convert ms to seconds
-                self.send_pending_commands
-            )
-            self.udp_timer.start()
+            # Single Tk timer: poll every tick, send every _send_divider ticks
+            self._send_counter = 0
+            self._idle_ticks = 0
+            self._next_tick = time.monotonic() + POLLING_INTERVAL / 1000.0
+            self._input_after_id = self.root.after(POLLING_INTERVAL, self._tick_input)
+            self._schedule_reverser_resend()
             
             logger.info("Input processing started")
         except Exception as e:
@@ -346,23 +619,59 @@ class Run8ControlConductor:
             raise
     
     def stop_input_processing(self) -> None:
-        """Stop input processing timers"""
+        """Stop the input processing timer"""
         try:
-            if self.input_timer:
-                self.input_timer.stop()
-                self.input_timer = None
+            if self._input_after_id is not None:
+                self.root.after_cancel(self._input_after_id)
+                self._input_after_id = None
+            if self._reverser_after_id is not None:
+                self.root.after_cancel(self._reverser_after_id)
+                self._reverser_after_id = None
             
-            if self.udp_timer:
-                self.udp_timer.stop()
-                self.udp_timer = None
+            # Wake the sender with a stop sentinel and wait for it to exit
+            if self.sender_thread:
+                self._send_q.put(None)
+                self.sender_thread.join(timeout=2.0)
+                self.sender_thread = None
             
-            # Clear pending commands
-            self.pending_commands.clear()
+            # Discard any commands still queued
+            with self._cmd_lock:
+                for values, dirty in ((self._cmd_values, self._cmd_dirty),
+                                      (self._cmd_read_values, self._cmd_read_dirty)):
+                    for function_id in dirty:
+                        values[function_id] = -1
+                    dirty.clear()
+                self._cmd_read_pending = False
+            while not self._send_q.empty():
+                self._send_q.get_nowait()
             
             logger.info("Input processing stopped")
         except Exception as e:
             logger.error(f"Error stopping input processing: {e}")
     
+    def _tick_input(self) -> None:
+        """Tk timer callback: poll inputs, flush queued commands on send ticks, reschedule"""
+        self._input_after_id = None
+        if not self.running:
+            return
+        self.process_inputs()
+        self._send_counter += 1
+        if self._send_counter >= self._send_divider:
+            self._send_counter = 0
+            self.send_pending_commands()
+        
+        # Schedule against a fixed deadline so the tick cost does not stretch the period;
+        # back off to the idle rate while the devices are untouched (first change snaps back)
+        now = time.monotonic()
+        interval = POLLING_INTERVAL if self._idle_ticks < IDLE_AFTER_TICKS else IDLE_POLLING_INTERVAL
+        self._next_tick += interval / 1000.0
+        if self._next_tick < now:
+            # Fell behind (e.g. a blocking dialog): skip missed ticks rather than bursting
+            self._next_tick = now
+        delay = max(1, int((self._next_tick - now) * 1000))
+        if self.running:
+            self._input_after_id = self.root.after(delay, self._tick_input)
+    
     def process_inputs(self) -> None:
         """Process inputs from all enabled devices"""
         if not self.running:
@@ -371,162 +680,199 @@ class Run8ControlConductor:
         try:
             # Process inputs from input manager first
             inputs = self.input_manager.process_inputs()
+            if not inputs:
+                self._idle_ticks += 1
+                return
+            self._idle_ticks = 0
+
+            # Bind hot lookups once per tick instead of per input
+            im = self.input_mapper
+            
+            # Drop events from unmapped inputs up front; nothing below reacts to them
+            active_input_keys = im.active_input_keys
+            inputs = [event for event in inputs if event[:3] in active_input_keys]
             if not inputs:
                 return
+            
+            queue_command = self._queue_command
+            states = self.state_tracker.states
+            # Debug formatting is skipped entirely unless DEBUG logging is on
+            debug = logger.isEnabledFor(logging.DEBUG)
 
             # --- 2-way/3-way reverser switch mode integration ---
-            mode = self.ui_manager.get_reverser_mode() if hasattr(self, 'ui_manager') else 'axis'
+            mode = self.reverser_mode
             if mode in ("2way", "3way"):
                 # Build input_state dict: (device_id, input_type, input_index) -> value
-                input_state = {}
-                for device_id, input_type, input_index, value in inputs:
-                    input_state[(device_id, input_type, input_index)] = value
-                # Update reverser state from mapped switch inputs
-                changed = self.input_mapper.update_reverser_3way_state_from_inputs(input_state)
-                # In 2-way mode, always send the packet if state changes or at interval
-                send_interval = 0.25 if mode == "2way" else 0.5
-                if changed or self.state_tracker.get_state('last_reverser_send_time', 0) < time.time() - send_interval:
-                    function_id = self.input_mapper.function_dict.get("Reverser Lever")
-                    if function_id:
-                        state = getattr(self.input_mapper, 'reverser_state', None)
-                        reverser_positions = getattr(self.input_mapper, 'reverser_positions', {
-                            "forward": 255,
-                            "neutral": 127,
-                            "reverse": 0
-                        })
-                        value = reverser_positions.get(state, 127)
-                        self.pending_commands[function_id] = value
-                        self.state_tracker.states['last_reverser_send_time'] = time.time()
-                        logger.info(f"Queued {mode} reverser command: state={state}, value={value}")
-
-            # --- Combined Throttle/Dyn logic ---
-            throttle_mode = self.ui_manager.get_throttle_mode() if hasattr(self, 'ui_manager') else 'separate'
-            if throttle_mode in ("toggle", "split"):
+                input_state = {event[:3]: event[3] for event in inputs}
+                # Update reverser state from mapped switch inputs; send immediately on a change
+                # (the periodic resend is scheduled separately, see _schedule_reverser_resend)
+                if im.update_reverser_3way_state_from_inputs(input_state):
+                    value = self._queue_reverser_state()
+                    if value is not None:
+                        logger.info(f"Queued {mode} reverser command: state={im.reverser_state}, value={value}")
+
+            # --- Combined Throttle/Dyn logic (skipped entirely in 'separate' mode) ---
+            combined_mode = self._combined_mode
+            if combined_mode:
+                throttle_mode = self._cached_throttle_mode
                 throttle_lever_value = None
                 toggle_button_value = None
                 # Use the mapping for "Throttle Lever" for all combined modes
-                throttle_mapping = self.input_mapper.function_input_map.get("Throttle Lever")
-                toggle_mapping = self.input_mapper.function_input_map.get("Throttle/Dyn Toggle")
+                throttle_mapping = im.throttle_lever_key
+                toggle_mapping = im.toggle_key
+                
+                # One dict probe per input for its role (the lever role wins if both
+                # are mapped to the same input)
+                mapping_targets = {}
+                if throttle_mode == "toggle" and toggle_mapping:
+                    mapping_targets[toggle_mapping] = _ROLE_TOGGLE_BUTTON
+                if throttle_mapping:
+                    mapping_targets[throttle_mapping] = _ROLE_COMBINED_LEVER
                 
-                for device_id, input_type, input_index, value in inputs:
-                    if throttle_mapping and (device_id, input_type, input_index) == throttle_mapping:
-                        throttle_lever_value = value
-                        logger.debug(f"Combined lever input: {value}")
-                    if throttle_mode == "toggle" and toggle_mapping and (device_id, input_type, input_index) == toggle_mapping:
-                        toggle_button_value = value
-                        logger.debug(f"Toggle button input: {value}")
+                if mapping_targets:
+                    get_role = mapping_targets.get
+                    for device_id, input_type, input_index, value in inputs:
+                        role = get_role((device_id, input_type, input_index))
+                        if role is None:
+                            continue
+                        if role == _ROLE_COMBINED_LEVER:
+                            throttle_lever_value = value
+                            if debug:
+                                logger.debug("Combined lever input: %s", value)
+                        else:
+                            toggle_button_value = value
+                            if debug:
+                                logger.debug("Toggle button input: %s", value)
                 
                 # Update toggle state if needed (detect button press edge)
                 if throttle_mode == "toggle" and toggle_button_value is not None:
-                    # Convert to boolean for button state
-                    current_button_pressed = bool(toggle_button_value)
-                    # Toggle on button press (rising edge)
-                    if current_button_pressed and not self.last_toggle_button_state:
-                        self.combined_toggle_state = not self.combined_toggle_state
-                        self.input_mapper.set_combined_toggle_state(self.combined_toggle_state)
+                    # Rising edge = pressed now AND not pressed last tick, as 0/1 ints
+                    current_button_pressed = 1 if toggle_button_value else 0
+                    edge = current_button_pressed & (1 - self.last_toggle_button_state)
+                    self.last_toggle_button_state = current_button_pressed
+                    if edge:
+                        self.combined_toggle_state ^= 1
+                        im.set_combined_toggle_state(bool(self.combined_toggle_state))
                         mode_name = "Dynamic Brake" if self.combined_toggle_state else "Throttle"
                         logger.info(f"Toggle switched to: {mode_name}")
-                    self.last_toggle_button_state = current_button_pressed
                 
                 # Process combined lever
                 if throttle_lever_value is not None:
                     # Apply axis reverse setting if configured for "Throttle Lever"
-                    reverse_setting = self.ui_manager.get_reverse_axis_setting("Throttle Lever")
-                    if reverse_setting:
+                    if im.get_axis_reverse("Throttle Lever"):
                         throttle_lever_value = -throttle_lever_value
-                        logger.debug(f"Applied axis reverse: value now {throttle_lever_value}")
+                        if debug:
+                            logger.debug("Applied axis reverse: value now %s", throttle_lever_value)
                     
                     if throttle_mode == "toggle":
-                        results = self.input_mapper.process_combined_lever_input(throttle_lever_value, self.combined_toggle_state)
+                        results = im.process_combined_lever_input(throttle_lever_value, bool(self.combined_toggle_state))
                     else:  # split mode
-                        results = self.input_mapper.process_combined_lever_input(throttle_lever_value, False)
+                        results = im.process_combined_lever_input(throttle_lever_value, False)
                     
-                    logger.debug(f"Combined lever results: {results}")
+                    if debug:
+                        logger.debug("Combined lever results: %s", results)
                     for fid, val in results:
-                        self.pending_commands[fid] = val
-                        logger.debug(f"Queued command: function_id={fid}, value={val}")
+                        queue_command(fid, val)
+                        if debug:
+                            logger.debug("Queued command: function_id=%s, value=%s", fid, val)
 
             # --- Normal input processing for regular mappings ---
-            regular_mappings = self.input_mapper.function_input_map.copy()
-            if regular_mappings:
-                for device_id, input_type, input_index, value in inputs:
-                    for function_name, (mapped_device, mapped_type, mapped_index) in regular_mappings.items():
-                        if (device_id == mapped_device and 
-                            input_type == mapped_type and 
-                            input_index == mapped_index):
-
-                            if function_name == "Reverser Lever" and self.reverser_switch_mode:
-                                continue
-
-                            # Skip throttle lever processing if in combined mode (it's handled above)
-                            if throttle_mode in ("toggle", "split") and function_name == "Throttle Lever":
-                                continue
-
-                            # Skip dyn brake lever processing if in combined mode AND it's the same mapping as throttle lever
-                            if (throttle_mode in ("toggle", "split") and 
-                                function_name == "Dyn Brake Lever" and 
-                                self.input_mapper.function_input_map.get("Throttle Lever") == (mapped_device, mapped_type, mapped_index)):
-                                continue
-
-                            if function_name in ["Train Brake Lever", "Independent Brake Lever", "Dyn Brake Lever"] and input_type == "Axis":
-                                function_id = self.input_mapper.function_dict.get(function_name)
-                                if function_id:
-                                    processed_value = self.input_mapper.process_brake_input(function_name, value)
-                                    self.pending_commands[function_id] = processed_value
-                                    continue
-
-                            changed, processed_value = self.input_mapper.process_input_value(
-                                function_name, device_id, input_type, input_index, value, 
-                                self.state_tracker.states
-                            )
-
-                            if changed:
-                                function_id = self.input_mapper.function_dict.get(function_name)
-                                if function_id:
-                                    self.pending_commands[function_id] = processed_value
-
-                            if input_type == 'Axis' and function_name != "Reverser Lever" or (function_name == "Reverser Lever" and not self.reverser_switch_mode):
-                                reverse_setting = self.ui_manager.get_reverse_axis_setting(function_name)
-                                self.input_mapper.set_axis_reverse(function_name, reverse_setting)
+            # One dict lookup per input via the mapper's reverse index
+            im.dispatch_inputs(inputs, states, queue_command, mode != 'axis', combined_mode)
         except Exception as e:
             logger.error(f"Error processing inputs: {e}")
     
+    def _queue_command(self, function_id: int, value: int) -> None:
+        """Record the latest value for function_id; repeated writes before a send coalesce"""
+        values = self._cmd_values
+        if values[function_id] < 0:
+            self._cmd_dirty.append(function_id)
+        # Clamp to the packet's byte range here so -1 stays free as the "not queued" marker
+        value = int(value)
+        values[function_id] = 0 if value < 0 else 255 if value > 255 else value
+    
+    def _drain_commands(self, function_ids: array, command_values: array) -> None:
+        """
+        Move every queued command of the read buffer into the given arrays and reset the buffer
+        
+        Args:
+            function_ids: Array to refill with the queued function_ids in first-queued order
+            command_values: Array to refill with the matching values
+        """
+        dirty = self._cmd_read_dirty
+        values = self._cmd_read_values
+        del function_ids[:]
+        del command_values[:]
+        function_ids.extend(dirty)
+        for function_id in dirty:
+            command_values.append(values[function_id])
+            values[function_id] = -1
+        dirty.clear()
+    
     def send_pending_commands(self) -> None:
-        """Send pending UDP commands"""
-        if not self.running or not self.pending_commands:
+        """Swap the command buffers and wake the sender thread to transmit the read side"""
+        if not self.running or not self._cmd_dirty:
             return
         
-        try:
-            # Send all pending commands
-            for function_id, value in self.pending_commands.items():
-                # Determine if audio flag should be used (default to True)
-                # This could be customized based on function_id if needed
-                use_audio = True
-
-                if self.udp_client.send_command(function_id, value, audio=use_audio):
-                    # Log reverser commands at info level for debugging
-                    if function_id == self.input_mapper.function_dict.get("Reverser Lever"):
-                        logger.info(f"Sent UDP reverser command: function={function_id}, value={value}")
-                    else:
-                        logger.debug(f"Sent UDP command: function={function_id}, value={value}")
-                else:
-                    logger.warning(f"Failed to send UDP command: function={function_id}, value={value}")
-            
-            # Clear pending commands
-            self.pending_commands.clear()
+        with self._cmd_lock:
+            if self._cmd_read_pending:
+                # Sender hasn't drained the last swap yet; keep coalescing into the write side
+                return
+            self._cmd_values, self._cmd_read_values = self._cmd_read_values, self._cmd_values
+            self._cmd_dirty, self._cmd_read_dirty = self._cmd_read_dirty, self._cmd_dirty
+            self._cmd_read_pending = True
+        # One entry per function_id per UDP tick, however bursty the input was
+        self._send_q.put(True)
+    
+    def _sender_loop(self) -> None:
+        """Sender thread: drain and transmit the read buffer each time it is handed over"""
+        # Keep the sender on one core so its cache stays warm between batches
+        pin_current_thread()
+        get_batch = self._send_q.get
+        function_ids = self._send_ids
+        command_values = self._send_values
+        send_arrays = self.udp_client.send_arrays
+        reverser_id = self.input_mapper.reverser_fid
+        while True:
+            if get_batch() is None:
+                break
             
-        except Exception as e:
-            logger.error(f"Error sending UDP commands: {e}")
+            try:
+                with self._cmd_lock:
+                    if not self._cmd_read_pending:
+                        continue  # Discarded by stop_input_processing
+                    self._drain_commands(function_ids, command_values)
+                    self._cmd_read_pending = False
+                
+                # The client packs straight from the arrays into its transmit slots;
+                # no per-command tuples or bytes objects. Audio flag on for every command
+                total = len(function_ids)
+                sent = send_arrays(function_ids, command_values)
+                if sent < total:
+                    logger.warning(f"Failed to send {total - sent} of {total} UDP commands")
+                
+                # Log reverser commands at info level for debugging
+                log_info = logger.info
+                log_debug = logger.debug if logger.isEnabledFor(logging.DEBUG) else None
+                for i in range(sent):
+                    function_id = function_ids[i]
+                    value = command_values[i]
+                    if function_id == reverser_id:
+                        log_info("Sent UDP reverser command: function=%s, value=%s", function_id, value)
+                    elif log_debug:
+                        log_debug("Sent UDP command: function=%s, value=%s", function_id, value)
+                
+            except Exception as e:
+                logger.error(f"Error sending UDP commands: {e}")
+        
+        logger.debug("UDP sender thread exited")
     
     def refresh_devices(self) -> None:
         """Refresh the list of available input devices"""
         try:
             devices = self.input_manager.refresh_devices()
             self.ui_manager.populate_device_list(devices)
-            
-            # Populate mapping interface with all available functions
-            all_functions = [name for name, _ in FunctionMapping.FUNCTIONS]
-            self.ui_manager.populate_mapping_interface(all_functions)
+            self.input_mapper.set_enabled_devices(self.input_manager.enabled_devices)
             
             # Update mapping displays
             self.update_mapping_displays()
@@ -534,8 +880,8 @@ class Run8ControlConductor:
             # Log detailed device information
             if devices:
                 logger.info(f"Refreshed devices - Found {len(devices)} devices")
-                thrustmaster_count = sum(1 for device in devices if any(tm in device.name.lower() 
-                                                                       for tm in ['thrustmaster', 'tm ', 't16000', 'twcs', 'hotas']))
+                is_thrustmaster = THRUSTMASTER_NAME_RE.search
+                thrustmaster_count = sum(1 for device in devices if is_thrustmaster(device.name))
                 if thrustmaster_count > 0:
                     logger.info(f"Found {thrustmaster_count} Thrustmaster device(s)")
                 else:
@@ -553,18 +899,15 @@ class Run8ControlConductor:
             logger.info("Performing force device refresh...")
             devices = self.input_manager.force_device_refresh()
             self.ui_manager.populate_device_list(devices)
-            
-            # Populate mapping interface with all available functions
-            all_functions = [name for name, _ in FunctionMapping.FUNCTIONS]
-            self.ui_manager.populate_mapping_interface(all_functions)
+            self.input_mapper.set_enabled_devices(self.input_manager.enabled_devices)
             
             # Update mapping displays
             self.update_mapping_displays()
             
             # Show result message
             if devices:
-                thrustmaster_devices = [device for device in devices if any(tm in device.name.lower() 
-                                                                           for tm in ['thrustmaster', 'tm ', 't16000', 'twcs', 'hotas'])]
+                is_thrustmaster = THRUSTMASTER_NAME_RE.search
+                thrustmaster_devices = [device for device in devices if is_thrustmaster(device.name)]
                 if thrustmaster_devices:
                     self.ui_manager.show_message("Success", 
                                                 f"Force refresh completed! Found {len(thrustmaster_devices)} Thrustmaster device(s):\n" +
@@ -605,6 +948,9 @@ class Run8ControlConductor:
                     logger.info(f"Disabled device {device_index}")
                 else:
                     logger.warning(f"Failed to disable device {device_index}")
+            
+            # Keep the dispatch index in step with the enabled devices
+            self.input_mapper.set_enabled_devices(self.input_manager.enabled_devices)
                     
         except Exception as e:
             logger.error(f"Error toggling device {device_index}: {e}")
@@ -623,74 +969,98 @@ class Run8ControlConductor:
             return
         
         # Check if input detection is already active to prevent rapid successive mapping
-        if hasattr(self.input_manager, 'detection_active') and self.input_manager.detection_active:
+        if self._has_detection_active and self.input_manager.detection_active:
             self.ui_manager.show_message("Info", "Input detection already in progress. Please wait for it to complete.", "info")
             return
             
         self.waiting_for_input = True
         self.input_target_function = function_name
-        # Special prompt for reverser 3-way
-        if function_name.startswith("Reverser 3way "):
-            pos = function_name.split(" ")[-1].capitalize()
-            self.ui_manager.set_mapping_prompt(f"Press the button/switch for 'Reverser {pos}' (5 second timeout)...")
-        elif function_name == "Reverser Lever" and self.reverser_switch_mode:
-            self.ui_manager.set_mapping_prompt(f"Press the button/switch for '{function_name}' in 3-position switch mode (5 second timeout)...")
+        # Start clean: no cancel flag, no result left over from a cancelled request
+        self._detection_cancel.clear()
+        try:
+            self._detection_result_q.get_nowait()
+        except queue.Empty:
+            pass
+        # Reverser 3-way rows and the reverser in switch mode ask for a button/switch
+        if function_name == "Reverser Lever" and self.reverser_mode != 'axis':
+            prompt = _REVERSER_LEVER_SWITCH_PROMPT
         else:
-            self.ui_manager.set_mapping_prompt(f"Ready - now move/press the input for '{function_name}' (5 second timeout)...")
-        detection_thread = threading.Thread(target=lambda: self._detect_input_thread_with_validation(function_name))
-        detection_thread.daemon = True
-        detection_thread.start()
+            prompt = _MAP_PROMPTS.get(function_name) or _PROMPT_READY.format(function_name)
+        self.ui_manager.set_mapping_prompt(prompt)
+        self._detect_serial += 1
+        self._detect_q.put((self._detect_serial, function_name))
+        self._detection_poll_id = self.root.after(DETECTION_POLL_INTERVAL, self._poll_detection_result)
     
 
-    def _detect_input_thread_with_validation(self, function_name: str) -> None:
-        """Thread function for input detection with input type validation"""
+    def _detect_worker(self) -> None:
+        """Detection worker: block in detect_input for each queued request, then queue the
+        result for the Tk thread, which does all validation, mapping and UI work"""
+        detect_input = self.input_manager.detect_input
+        while True:
+            request = self._detect_q.get()
+            if request is None:
+                break
+            serial, function_name = request
+            error = None
+            try:
+                detected_input = detect_input(timeout=5.0)
+            except Exception as e:
+                detected_input = None
+                error = e
+            if self._detection_cancel.is_set():
+                continue  # Cancelled while waiting; nobody wants this result
+            self._detection_result_q.put((serial, function_name, detected_input, error))
+    
+    def _poll_detection_result(self) -> None:
+        """Tk timer callback: apply the detection result once the worker has queued it"""
+        self._detection_poll_id = None
+        while True:
+            try:
+                serial, function_name, detected_input, error = self._detection_result_q.get_nowait()
+            except queue.Empty:
+                if self.waiting_for_input:
+                    self._detection_poll_id = self.root.after(DETECTION_POLL_INTERVAL, self._poll_detection_result)
+                return
+            if serial == self._detect_serial and function_name == self.input_target_function:
+                break
+            # Left over from a request cancelled after the worker's cancel check
+            logger.debug("Dropping stale detection result for %s (request %d)", function_name, serial)
+        self._handle_detected_input(function_name, detected_input, error)
+    
+    def _stop_detection_poll(self) -> None:
+        """Signal the detection worker to drop its result and stop polling for it"""
+        self._detection_cancel.set()
+        if self._detection_poll_id is not None:
+            self.root.after_cancel(self._detection_poll_id)
+            self._detection_poll_id = None
+    
+    def _handle_detected_input(self, function_name: str, detected_input: Optional[Tuple[int, str, int]],
+                               error: Optional[Exception] = None) -> None:
+        """Tk-thread half of input mapping: validate the detected input and apply the mapping"""
         try:
-            detected_input = self.input_manager.detect_input(timeout=5.0)
+            if error is not None:
+                raise error
             if detected_input and self.input_target_function:
                 device_id, detected_input_type, input_index = detected_input
-                # Determine required input type for this function
-                from config import FunctionMapping
-                required_type = FunctionMapping.INPUT_TYPES.get(function_name, 'toggle')
-                # Normalize input types for comparison
-                detected_type_norm = detected_input_type.lower()
-                required_type_norm = required_type.lower()
-                # Validation logic
-                valid = True
-                error_msg = None
-                # For reverser 3way, only allow Button
-                if function_name.startswith("Reverser 3way "):
-                    if detected_type_norm != 'button':
-                        valid = False
-                        error_msg = "Reverser 3-way positions can only be mapped to buttons/switches. Please try again with a button input."
-                # For lever/axis functions, only allow Axis
-                elif required_type_norm == 'lever':
-                    if detected_type_norm != 'axis':
-                        valid = False
-                        error_msg = f"'{function_name}' can only be mapped to an axis/lever input. Please try again with an axis input."
-                # For momentary/toggle, only allow Button
-                elif required_type_norm in ('momentary', 'toggle'):
-                    if detected_type_norm != 'button':
-                        valid = False
-                        error_msg = f"'{function_name}' can only be mapped to a button/switch input. Please try again with a button input."
-                # For 3way/4way, only allow Button
-                elif required_type_norm in ('3way', '4way'):
-                    if detected_type_norm != 'button':
-                        valid = False
-                        error_msg = f"'{function_name}' can only be mapped to a button/switch input. Please try again with a button input."
-                if not valid:
-                    self.ui_manager.show_message("Invalid Input Type", error_msg or "Incompatible input type.", "error")
+                reverser_pos = REVERSER_3WAY_POSITIONS.get(function_name)
+                # Validation: one table lookup for the rule, one comparison against
+                # the detected type as detect_input reports it ('Axis', 'Button', 'Hat')
+                rule = _INPUT_RULES.get(function_name)
+                allowed, error_msg = rule if rule is not None else _input_rule(function_name)
+                if allowed is not None and detected_input_type != allowed:
+                    self.ui_manager.show_message("Invalid Input Type", error_msg, "error")
                     self.ui_manager.set_mapping_prompt("Mapping cancelled: incompatible input type.")
                     return
                 # --- Existing logic follows ---
-                if function_name.startswith("Reverser 3way "):
-                    pos = function_name.split(" ")[-1]
-                    self.input_mapper.set_reverser_3way_mapping(pos, device_id, detected_input_type, input_index)
+                if reverser_pos is not None:
+                    self.input_mapper.set_reverser_3way_mapping(reverser_pos, device_id, detected_input_type, input_index)
                     display_text = format_input_display(device_id, detected_input_type, input_index)
                     self.ui_manager.update_mapping_display(function_name, display_text)
-                    self.ui_manager.set_mapping_prompt(f"Successfully mapped 'Reverser {pos.capitalize()}' to {display_text}")
-                    logger.info(f"Mapped Reverser 3way {pos} to {display_text}")
+                    message = _PROMPT_MAPPED.format(_REVERSER_ROW_LABELS[function_name], display_text)
+                    self.ui_manager.set_mapping_prompt(message)
+                    logger.info(message)
                     # Auto-save the new mapping
-                    self._auto_save_mappings()
+                    self._schedule_autosave()
                 else:
                     existing_func = self.input_mapper.find_existing_mapping(device_id, detected_input_type, input_index)
                     if existing_func and existing_func != function_name:
@@ -706,25 +1076,30 @@ class Run8ControlConductor:
                             return
                         elif choice == 'clear':
                             self.input_mapper.remove_mapping(existing_func)
+                            self._dirty_reverse_axis.add(existing_func)
                             self.ui_manager.update_mapping_display(existing_func, "Not mapped")
                             logger.info(f"Cleared mapping for {existing_func} to allow remapping.")
                         # else: keep both (fall through)
                     if self.input_mapper.add_mapping(function_name, device_id, detected_input_type, input_index):
+                        self._sync_dirty_reverse_axis()
                         display_text = format_input_display(device_id, detected_input_type, input_index)
                         self.ui_manager.update_mapping_display(function_name, display_text)
-                        self.ui_manager.set_mapping_prompt(f"Successfully mapped '{function_name}' to {display_text}")
-                        logger.info(f"Mapped {function_name} to {display_text}")
+                        message = _PROMPT_MAPPED.format(function_name, display_text)
+                        self.ui_manager.set_mapping_prompt(message)
+                        logger.info(message)
                         # Auto-save the new mapping
-                        self._auto_save_mappings()
+                        self._schedule_autosave()
                     else:
-                        self.ui_manager.set_mapping_prompt(f"Failed to map '{function_name}'")
-                        logger.error(f"Failed to map {function_name}")
+                        message = _PROMPT_FAILED.format(function_name)
+                        self.ui_manager.set_mapping_prompt(message)
+                        logger.error(message)
             else:
                 self.ui_manager.set_mapping_prompt("No input detected - timeout reached")
                 logger.info("Input detection timed out")
         except Exception as e:
-            logger.error(f"Error during input detection: {e}")
-            self.ui_manager.set_mapping_prompt(f"Error during input detection: {e}")
+            message = _PROMPT_DETECT_ERROR.format(e)
+            logger.error(message)
+            self.ui_manager.set_mapping_prompt(message)
         finally:
             self.waiting_for_input = False
             self.input_target_function = None
@@ -732,36 +1107,31 @@ class Run8ControlConductor:
     def clear_mapping(self, function_name: str) -> None:
         """Clear mapping for a specific function"""
         if self.input_mapper.remove_mapping(function_name):
+            # remove_mapping drops the reverse flag but the checkbox keeps its state
+            self._dirty_reverse_axis.add(function_name)
             self.ui_manager.update_mapping_display(function_name, "Not mapped")
             logger.info(f"Cleared mapping for {function_name}")
             # Auto-save the change
-            self._auto_save_mappings()
+            self._schedule_autosave()
         else:
             logger.warning(f"No mapping found for {function_name}")
     
     def load_mappings(self, file_path: Optional[str] = None) -> None:
         """Load mappings from file"""
         try:
-            if self.input_mapper.load_mappings_from_csv(file_path):
-                # Get the reverser mode from the input mapper after loading
-                # The input mapper now loads the mode correctly from the CSV
-                if self.input_mapper.reverser_switch_mode:
-                    if getattr(self.input_mapper, 'reverser_two_input_mode', False):
-                        mode = '2way'
-                    else:
-                        mode = '3way'
-                else:
-                    mode = 'axis'
-                    
-                # Sync the mode with main.py's state
-                self.reverser_switch_mode = (mode != 'axis')
+            loaded = self.input_mapper.load_mappings_from_csv(file_path)
+            # The load replaced every reverse flag. Mapped rows get theirs from the file
+            # (the display refresh pushes them into the checkboxes); for unmapped lever
+            # rows the checkbox is the only record, applied once they are mapped again
+            self._dirty_reverse_axis = set(_LEVER_FUNCTIONS.difference(self.input_mapper.function_input_map))
+            if loaded:
+                # The input mapper loads the reverser mode from the CSV; adopt it
+                mode = self.input_mapper.get_current_mode_string()
+                self._set_reverser_mode(mode)
                 
                 # Update the UI to reflect the loaded mode
                 self.ui_manager.set_reverser_mode(mode)
                 
-                # Update the input mapper to ensure consistency
-                self.input_mapper.set_reverser_switch_mode(mode)
-                
                 # Update mapping displays
                 self.update_mapping_displays()
                 
@@ -792,34 +1162,15 @@ class Run8ControlConductor:
     def save_mappings(self, file_path: Optional[str] = None) -> None:
         """Save mappings to file (for manual save/load of different configurations)"""
         try:
-            # Update reverse axis settings from UI
-            for function_name in self.input_mapper.get_mapped_functions():
-                if function_name == "Reverser Lever" and self.reverser_switch_mode:
-                    # Skip reverse axis setting for reverser in switch mode
-                    continue
-                    
-                reverse_setting = self.ui_manager.get_reverse_axis_setting(function_name)
-                self.input_mapper.set_axis_reverse(function_name, reverse_setting)
-            
-            # Ensure the input mapper has the correct reverser mode before saving
-            # Convert boolean reverser_switch_mode to proper string mode
-            if self.reverser_switch_mode:
-                # Determine if it's 2way or 3way mode
-                if getattr(self.input_mapper, 'reverser_two_input_mode', False):
-                    mode = '2way'
-                else:
-                    mode = '3way'
-            else:
-                mode = 'axis'
-            
-            # Set the mode in the input mapper to ensure consistency
-            self.input_mapper.set_reverser_switch_mode(mode)
+            self._sync_dirty_reverse_axis()
+            self._check_reverse_axis_sync()
             
             # Validate mappings before saving
             if not self.input_mapper.validate_mappings():
                 logger.warning("Mapping validation found issues, but proceeding with save")
             
             # Perform the save
+            mode = self.reverser_mode
             if self.input_mapper.save_mappings(file_path):
                 if file_path:
                     self.ui_manager.set_mapping_prompt(f"Mappings saved to {file_path}")
@@ -829,63 +1180,79 @@ class Run8ControlConductor:
                     self.ui_manager.set_mapping_prompt("Mappings saved successfully")
                     logger.info(f"Mappings saved successfully (reverser mode: {mode})")
                     # Update the persistent mappings as well
-                    self._auto_save_mappings()
+                    self._schedule_autosave()
             else:
                 self.ui_manager.set_mapping_prompt("Failed to save mappings")
                 logger.error("Failed to save mappings")
         except Exception as e:
-            logger.error(f"Error saving mappings: {e}")
+            logger.error("Error saving mappings: %s", e)
             self.ui_manager.show_message("Error", f"Failed to save mappings: {e}", "error")
     
     def clear_mappings(self) -> None:
         """Clear all mappings"""
+        # Nothing to clear: skip the confirmation dialog and the display refresh
+        if not self.input_mapper.function_input_map and not self.input_mapper.reverser_3way_mappings:
+            self.ui_manager.set_mapping_prompt("No mappings to clear")
+            return
         if self.ui_manager.ask_yes_no("Confirm", "Are you sure you want to clear all mappings?"):
+            # Clearing drops every reverse flag, including those of unmapped lever rows
+            # whose checkboxes stay set; re-apply them as the rows are mapped again
+            self._dirty_reverse_axis.update(self.input_mapper.function_input_map)
+            self._dirty_reverse_axis.update(_LEVER_FUNCTIONS)
             self.input_mapper.clear_all_mappings()
             self.update_mapping_displays()
             self.ui_manager.set_mapping_prompt("All mappings cleared")
             logger.info("All mappings cleared")
             # Auto-save the cleared state
-            self._auto_save_mappings()
+            self._schedule_autosave()
     
     def update_mapping_displays(self) -> None:
+        """Schedule a refresh of all mapping displays; bursts of calls collapse into one pass"""
+        if self._refresh_scheduled:
+            return
+        self._refresh_scheduled = True
+        self.root.after_idle(self._run_display_refresh)
+    
+    def _run_display_refresh(self) -> None:
+        """Idle callback for update_mapping_displays"""
+        self._refresh_scheduled = False
+        self._do_update_mapping_displays()
+    
+    def _do_update_mapping_displays(self) -> None:
         """Update all mapping displays in the UI"""
-        try:
-            mappings = self.input_mapper.get_all_mappings()
-            logger.info(f"Updating UI displays with {len(mappings)} mappings: {mappings}")
-            
-            # Update each function's display
-            for function_name, _ in FunctionMapping.FUNCTIONS:
-                if function_name in mappings:
-                    device_id, input_type, input_index = mappings[function_name]
-                    display_text = format_input_display(device_id, input_type, input_index)
-                    self.ui_manager.update_mapping_display(function_name, display_text)
-                    logger.debug(f"Updated display for {function_name}: {display_text}")
-                    
-                    # Update reverse axis setting
-                    reverse_setting = self.input_mapper.get_axis_reverse(function_name)
-                    self.ui_manager.set_reverse_axis_setting(function_name, reverse_setting)
-                else:
-                    self.ui_manager.update_mapping_display(function_name, "Not mapped")
-            
-            # Update reverser 3-way mappings if they exist
-            if hasattr(self.input_mapper, 'reverser_3way_mappings') and self.input_mapper.reverser_3way_mappings:
-                for pos in ['forward', 'neutral', 'reverse']:
-                    reverser_function_name = f"Reverser 3way {pos}"
-                    if pos in self.input_mapper.reverser_3way_mappings:
-                        device_id, input_type, input_index = self.input_mapper.reverser_3way_mappings[pos]
-                        display_text = format_input_display(device_id, input_type, input_index)
-                        self.ui_manager.update_mapping_display(reverser_function_name, display_text)
-                        logger.debug(f"Updated reverser 3-way display: {reverser_function_name} -> {display_text}")
-                    else:
-                        self.ui_manager.update_mapping_display(reverser_function_name, "Not mapped")
+        mappings = self.input_mapper.get_all_mappings()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Updating UI displays with %d mappings: %r", len(mappings), mappings)
+        
+        # Build every row (display text, reverse checkbox state) and hand them to the UI
+        # in one call; the UI manager skips widgets whose state is unchanged
+        get_reverse = self.input_mapper.get_axis_reverse
+        fmt = format_input_display  # memoized per (device_id, input_type, input_index)
+        rows: Dict[str, Tuple[str, Optional[bool]]] = {}
+        for function_name in _FUNCTION_NAMES:
+            entry = mappings.get(function_name)
+            if entry is not None:
+                rows[function_name] = (fmt(*entry), get_reverse(function_name))
             else:
-                # Clear reverser 3-way displays if no mappings exist
-                for pos in ['forward', 'neutral', 'reverse']:
-                    reverser_function_name = f"Reverser 3way {pos}"
-                    self.ui_manager.update_mapping_display(reverser_function_name, "Not mapped")
-                    
-        except Exception as e:
-            logger.error(f"Error updating mapping displays: {e}")
+                rows[function_name] = ("Not mapped", None)
+        
+        # Reverser 3-way rows have no reverse checkbox; unmapped positions show "Not mapped"
+        reverser_3way_mappings = self.input_mapper.reverser_3way_mappings
+        for pos, reverser_function_name in _REVERSER_3WAY_ROWS:
+            entry = reverser_3way_mappings.get(pos)
+            rows[reverser_function_name] = (fmt(*entry) if entry is not None else "Not mapped", None)
+        
+        if debug:
+            logger.debug("Refreshing %d mapping rows", len(rows))
+        for function_name, error in self.ui_manager.update_mapping_displays_bulk(rows).items():
+            self._warn_display_error(function_name, error)
+    
+    def _warn_display_error(self, function_name: str, error: Exception) -> None:
+        """Log a display update failure once per function"""
+        if function_name not in self._display_errors_logged:
+            self._display_errors_logged.add(function_name)
+            logger.error("Error updating mapping display for %s: %s", function_name, error)
     
     def on_closing(self) -> None:
         """Handle application closing"""
@@ -895,27 +1262,48 @@ class Run8ControlConductor:
         if self.running:
             self.stop_application()
         
-        # Auto-save current mappings before closing
+        # Let the detection worker exit
+        self._stop_detection_poll()
+        self._detect_q.put(None)
+        
+        # Snapshot the mappings now and queue the final write behind any pending one;
+        # it runs on the autosave worker alongside the cleanup below
         self._auto_save_mappings()
         
-        # Cleanup resources
+        # Close the UDP socket on a daemon thread while the input manager cleans up
+        # here: pygame.quit must run on the main thread, and a hung disconnect must
+        # not hold up (or, being a daemon, outlive) the exit
+        udp_thread = threading.Thread(target=self._disconnect_udp, name="udp-cleanup", daemon=True)
+        udp_thread.start()
         try:
             self.input_manager.cleanup()
-            self.udp_client.disconnect()
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during input manager cleanup: %s", e)
+        udp_thread.join(timeout=2.0)
+        if udp_thread.is_alive():
+            logger.warning("Timed out waiting for UDP client cleanup")
+        
+        # The mappings must reach disk before we exit
+        self._autosave_executor.shutdown(wait=True)
         
         # Destroy the main window
         self.root.destroy()
         logger.info("Application closed")
     
+    def _disconnect_udp(self) -> None:
+        """Shutdown helper: disconnect the UDP client, logging any error"""
+        try:
+            self.udp_client.disconnect()
+        except Exception as e:
+            logger.error("Error during UDP client cleanup: %s", e)
+    
     def run(self) -> None:
         """Run the main application loop"""
         try:
             logger.info("Starting main application loop")
             self.root.mainloop()
         except Exception as e:
-            logger.error(f"Error in main loop: {e}")
+            logger.error("Error in main loop: %s", e)
             raise
         finally:
             logger.info("Main application loop ended")
@@ -923,8 +1311,9 @@ class Run8ControlConductor:
     def cancel_input_mapping(self) -> None:
         """Cancel ongoing input mapping"""
         if self.waiting_for_input:
-            if hasattr(self.input_manager, 'cancel_input_detection'):
+            if self._can_cancel_detection:
                 if self.input_manager.cancel_input_detection():
+                    self._stop_detection_poll()
                     self.ui_manager.set_mapping_prompt("Input mapping cancelled by user")
                     self.waiting_for_input = False
                     self.input_target_function = None
@@ -933,6 +1322,7 @@ class Run8ControlConductor:
                     self.ui_manager.set_mapping_prompt("No active input detection to cancel")
             else:
                 # Fallback for older version
+                self._stop_detection_poll()
                 self.waiting_for_input = False
                 self.input_target_function = None
                 self.ui_manager.set_mapping_prompt("Input mapping cancelled by user")
@@ -947,8 +1337,11 @@ def main():
         app = Run8ControlConductor()
         app.run()
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         raise
+    finally:
+        # Flush queued log records once nothing else will log
+        shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -5,8 +5,11 @@ Handles the logic for mapping inputs to Run8 functions and processing input valu
 """
 
 import csv
+import io
 import os
-from typing import Dict, List, Tuple, Optional, Any
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 import logging
 
 from config import FunctionMapping
@@ -18,8 +21,91 @@ logger = logging.getLogger(__name__)
 # Input detection constants
 DEADZONE = 0.7
 
+# Levers that send a direct 0-255 brake value
+BRAKE_LEVERS = frozenset({'Train Brake Lever', 'Independent Brake Lever', 'Dyn Brake Lever'})
+
+# Positions a button cycles through for multi-position switch behaviors
+MULTIWAY_STATE_COUNTS = {'3way': 3, '4way': 4}
+
+# Behavior codes the _process_* handlers branch on, resolved from the behavior
+# string once per handler so the per-sample checks compare ints. Behaviors with
+# no button/axis/hat handling of their own (e.g. '5way') map to _OTHER
+_TOGGLE, _MOMENTARY, _THREE_WAY, _FOUR_WAY, _OTHER = range(5)
+_BEHAVIOR_CODES = {'toggle': _TOGGLE, 'momentary': _MOMENTARY, '3way': _THREE_WAY, '4way': _FOUR_WAY}
+_MULTIWAY_CODE_STATE_COUNTS = {_BEHAVIOR_CODES[name]: count for name, count in MULTIWAY_STATE_COUNTS.items()}
+
+# Hat readings are one of nine (x, y) states, so decode them by table lookup.
+# Active = off center; 3-way follows the vertical direction (Down=0, Center=1,
+# Up=2, diagonals by their vertical component); 4-way is Down/Left/Up/Right = 0-3
+_HAT_STATES = [(x, y) for x in (-1, 0, 1) for y in (-1, 0, 1)]
+_HAT_ACTIVE = {hat: hat != (0, 0) for hat in _HAT_STATES}
+_HAT_3WAY_POSITIONS = {hat: hat[1] + 1 for hat in _HAT_STATES}
+_HAT_4WAY_POSITIONS = {(0, -1): 0, (-1, 0): 1, (0, 1): 2, (1, 0): 3}
+
+# Reverser 3-way switch positions and the function names their mappings appear under
+REVERSER_POSITIONS = ('forward', 'neutral', 'reverse')
+REVERSER_3WAY_FUNCTIONS = {pos: f"Reverser 3way {pos}" for pos in REVERSER_POSITIONS}
+REVERSER_3WAY_POSITIONS = {name: pos for pos, name in REVERSER_3WAY_FUNCTIONS.items()}
+
+
+def _mapping_entry(device_id: int, input_type: str, input_index: int) -> Tuple[int, str, int]:
+    """Build a (device_id, input_type, input_index) mapping entry with an interned type
+    
+    Input events carry 'Button'/'Axis'/'Hat' as interned literals; interning the type of
+    entries read from CSV or the UI lets dict lookups on these keys match by identity
+    instead of comparing strings, and keeps one copy of each type name in memory.
+    """
+    return (device_id, sys.intern(input_type), input_index)
+
+
+# Lever arithmetic: axis clamping and the throttle notch, brake and reverser values
+def _lever_axis(raw_value: float, reverse: bool) -> float:
+    """Apply the reverse setting to a raw axis value and clamp it to [-1, 1]"""
+    axis_val = -raw_value if reverse else raw_value
+    # Compare-and-select instead of max(min()); the <= keeps a NaN reading at 1.0
+    return -1.0 if axis_val < -1.0 else (axis_val if axis_val <= 1.0 else 1.0)
+
+
+def _throttle_notch(axis_val: float) -> int:
+    """Throttle notch 0-8 for a clamped axis value"""
+    return round((axis_val + 1.0) * 4.0)
+
+
+def _brake_value(axis_val: float) -> int:
+    """Brake lever value 0-255 for a clamped axis value (full -1..1 travel)"""
+    return int((axis_val + 1.0) * 127.5)
+
+
+def _reverser_lever_value(axis_val: float) -> int:
+    """Reverser value for an axis: wide neutral band, reverse/forward past +-0.8"""
+    if axis_val < -0.8:
+        return 0
+    if axis_val > 0.8:
+        return 255
+    return 127
+
+
+_REVERSER_VALUE_POSITIONS = {0: 'reverse', 127: 'neutral', 255: 'forward'}
+
+
+def _ignore_input(raw_value: Any, mapping_key: Tuple, prev_states: Dict) -> Tuple[bool, int]:
+    """Handler for inputs a function does not react to"""
+    return False, 0
+
 
 class InputMapper:
+    __slots__ = (
+        'mapping_file', 'function_input_map', 'reverse_axis_settings', 'multiway_states',
+        '_hat_switch_positions', 'function_dict', '_behavior_cache', '_dispatch', '_handlers',
+        'throttle_mode', 'combined_toggle_state', 'reverser_fid', 'throttle_fid',
+        'dyn_brake_fid', 'reverser_switch_mode', 'reverser_two_input_mode', 'reverser_state',
+        'reverser_positions', 'reverser_3way_mappings', '_reverser_assigned',
+        '_reverser_button_positions', 'axis_brake_functions', 'input_to_functions',
+        'enabled_devices', '_input_owner', 'active_input_keys', 'throttle_lever_key',
+        'toggle_key', '_skip_sets', 'mapping_version', '_saved_state', '_all_mappings_view',
+        '_all_mappings_version',
+    )
+    
     # --- Combined Throttle/Dynamic Brake support ---
     def set_throttle_mode(self, mode: str):
         """Set the throttle mode: 'separate', 'toggle', or 'split'"""
@@ -30,7 +116,7 @@ class InputMapper:
             self.combined_toggle_state = None
 
     def get_throttle_mode(self) -> str:
-        return getattr(self, 'throttle_mode', 'separate')
+        return self.throttle_mode
 
     def set_combined_toggle_state(self, state: bool):
         self.combined_toggle_state = state
@@ -46,8 +132,8 @@ class InputMapper:
         """
         results = []
         mode = self.get_throttle_mode()
-        throttle_id = self.function_dict.get('Throttle Lever')
-        dyn_id = self.function_dict.get('Dyn Brake Lever')
+        throttle_id = self.throttle_fid
+        dyn_id = self.dyn_brake_fid
         
         # Ensure we have valid function IDs
         if throttle_id is None or dyn_id is None:
@@ -59,25 +145,25 @@ class InputMapper:
         if abs(value) < deadzone:
             value = 0.0
         
-        logger.debug(f"Combined lever processing: mode={mode}, value={value:.3f}, toggle_state={toggle_state}")
+        logger.debug("Combined lever processing: mode=%s, value=%.3f, toggle_state=%s", mode, value, toggle_state)
         
         if mode == 'split':
             # Center = idle, positive = throttle, negative = dynamic brake
             if value > deadzone:
                 # Throttle - Use notch system (0-8 notches) like normal throttle processing
                 throttle_notch = int(round(value * 8))
-                throttle_notch = max(0, min(8, throttle_notch))
+                throttle_notch = 0 if throttle_notch < 0 else (8 if throttle_notch > 8 else throttle_notch)
                 results.append((throttle_id, throttle_notch))
                 results.append((dyn_id, 0))
-                logger.debug(f"Split mode throttle: input={value:.3f} -> notch={throttle_notch}")
+                logger.debug("Split mode throttle: input=%.3f -> notch=%s", value, throttle_notch)
             elif value < -deadzone:
                 # Dynamic brake - Use proper brake mapping (0-255)
                 # Map negative values (-1 to 0) to brake range (0 to 255)
                 dyn_val = int(abs(value) * 255)
-                dyn_val = max(0, min(255, dyn_val))
+                dyn_val = 0 if dyn_val < 0 else (255 if dyn_val > 255 else dyn_val)
                 results.append((throttle_id, 0))
                 results.append((dyn_id, dyn_val))
-                logger.debug(f"Split mode dynamic: input={value:.3f} -> output={dyn_val}")
+                logger.debug("Split mode dynamic: input=%.3f -> output=%s", value, dyn_val)
             else:
                 # Idle position
                 results.append((throttle_id, 0))
@@ -93,18 +179,18 @@ class InputMapper:
                 # Map full axis range (-1 to 1) to brake range (0 to 255)
                 # Same formula as train brake: -1.0 = no braking (0), +1.0 = full braking (255)
                 dyn_val = int(((value + 1.0) / 2.0) * 255)
-                dyn_val = max(0, min(255, dyn_val))
+                dyn_val = 0 if dyn_val < 0 else (255 if dyn_val > 255 else dyn_val)
                 results.append((throttle_id, 0))
                 results.append((dyn_id, dyn_val))
-                logger.debug(f"Toggle mode dynamic: input={value:.3f} -> output={dyn_val} (full range)")
+                logger.debug("Toggle mode dynamic: input=%.3f -> output=%s (full range)", value, dyn_val)
             else:
                 # Throttle mode - use notch system like normal throttle
                 # Convert full axis range (-1 to 1) to throttle notches (0 to 8)
                 throttle_notch = int(round(((value + 1.0) / 2.0) * 8))
-                throttle_notch = max(0, min(8, throttle_notch))
+                throttle_notch = 0 if throttle_notch < 0 else (8 if throttle_notch > 8 else throttle_notch)
                 results.append((throttle_id, throttle_notch))
                 results.append((dyn_id, 0))
-                logger.debug(f"Toggle mode throttle: input={value:.3f} -> notch={throttle_notch}")
+                logger.debug("Toggle mode throttle: input=%.3f -> notch=%s", value, throttle_notch)
         else:
             # Separate mode, do nothing here
             pass
@@ -141,18 +227,22 @@ class InputMapper:
         # Only use 3-way mappings if switch mode is enabled
         if not self.get_reverser_switch_mode():
             return False
-        if not hasattr(self, 'reverser_3way_mappings') or not self.reverser_3way_mappings:
+        mappings = self.reverser_3way_mappings
+        if not mappings:
             return False
 
         prev_state = self.reverser_state
+        # Mapping tuples are the input_state keys, so each position costs one dict probe
+        # (input values are never None, so a None result means "not in this cycle")
+        get_value = input_state.get
         
         # Check which positions have mappings
-        forward_mapping = self.reverser_3way_mappings.get("forward")
-        neutral_mapping = self.reverser_3way_mappings.get("neutral")
-        reverse_mapping = self.reverser_3way_mappings.get("reverse")
+        forward_mapping = mappings.get("forward")
+        neutral_mapping = mappings.get("neutral")
+        reverse_mapping = mappings.get("reverse")
         
         # Determine if we're in 2-input mode (only forward and reverse mapped, or explicit setting)
-        mapped_positions = [pos for pos in ["forward", "neutral", "reverse"] if self.reverser_3way_mappings.get(pos)]
+        mapped_positions = [pos for pos in ("forward", "neutral", "reverse") if mappings.get(pos)]
         is_two_input_mode = (self.reverser_two_input_mode or 
                             (len(mapped_positions) == 2 and "neutral" not in mapped_positions))
         
@@ -164,20 +254,20 @@ class InputMapper:
             reverse_active = False
             
             if forward_mapping:
-                device_id, input_type, input_index = forward_mapping
-                if (device_id, input_type, input_index) in input_state:
+                input_type = forward_mapping[1]
+                value = get_value(forward_mapping)
+                if value is not None:
                     reverser_input_present = True
-                    value = input_state.get((device_id, input_type, input_index))
                     if input_type == "Button" and value == 1:
                         forward_active = True
                     elif input_type == "Hat" and value == (0, 1):
                         forward_active = True
             
             if reverse_mapping:
-                device_id, input_type, input_index = reverse_mapping
-                if (device_id, input_type, input_index) in input_state:
+                input_type = reverse_mapping[1]
+                value = get_value(reverse_mapping)
+                if value is not None:
                     reverser_input_present = True
-                    value = input_state.get((device_id, input_type, input_index))
                     if input_type == "Button" and value == 1:
                         reverse_active = True
                     elif input_type == "Hat" and value == (0, -1):
@@ -210,15 +300,15 @@ class InputMapper:
             active_pos = None
             
             for pos in ("forward", "neutral", "reverse"):
-                mapping = self.reverser_3way_mappings.get(pos)
+                mapping = mappings.get(pos)
                 if not mapping:
                     continue
-                device_id, input_type, input_index = mapping
+                input_type = mapping[1]
                 
                 # Check if this reverser input is present in the current input cycle
-                if (device_id, input_type, input_index) in input_state:
+                value = get_value(mapping)
+                if value is not None:
                     reverser_input_present = True
-                    value = input_state.get((device_id, input_type, input_index))
                     if input_type == "Button":
                         # Button is considered active if value == 1 (pressed)
                         if value == 1:
@@ -254,10 +344,7 @@ class InputMapper:
         Find if an input is already mapped to a function.
         Returns the function name if found, else None.
         """
-        for func, mapping in self.function_input_map.items():
-            if mapping == (device_id, input_type, input_index):
-                return func
-        return None
+        return self._input_owner.get((device_id, input_type, input_index))
 
     def __init__(self, mapping_file: Optional[str] = None):
         """
@@ -275,7 +362,30 @@ class InputMapper:
             'Headlight Rear': 0,
             'Wiper Switch': 0
         }
+        # Last position reported by hat-driven 3-way/4-way switches, per function
+        self._hat_switch_positions: Dict[str, int] = {}
         self.function_dict = {name: value for name, value in FunctionMapping.FUNCTIONS}
+        # Input behavior per function (default 'toggle') and the generic handler for each
+        # non-lever (behavior, input type) pair; levers get their own handlers below
+        self._behavior_cache: Dict[str, str] = dict.fromkeys(self.function_dict, 'toggle')
+        self._behavior_cache.update(FunctionMapping.INPUT_TYPES)
+        self._dispatch: Dict[Tuple[str, str], Callable[..., Tuple[bool, int]]] = {}
+        for behavior in set(self._behavior_cache.values()) | {'toggle'}:
+            if behavior != 'lever':
+                self._dispatch[(behavior, 'Button')] = self._process_button_input
+                self._dispatch[(behavior, 'Axis')] = self._process_axis_input
+                self._dispatch[(behavior, 'Hat')] = self._process_hat_input
+        # (function name, input type) -> handler specialized for that pair, built on
+        # first use by _make_handler; processing an input is one lookup and one call
+        self._handlers: Dict[Tuple[str, str], Callable[[Any, Tuple, Dict], Tuple[bool, int]]] = {}
+        
+        # Combined throttle/dynamic brake settings (see set_throttle_mode)
+        self.throttle_mode = 'separate'
+        self.combined_toggle_state: Optional[bool] = None
+        # function_dict never changes, so resolve the ids the hot paths need once
+        self.reverser_fid: Optional[int] = self.function_dict.get("Reverser Lever")
+        self.throttle_fid: Optional[int] = self.function_dict.get("Throttle Lever")
+        self.dyn_brake_fid: Optional[int] = self.function_dict.get("Dyn Brake Lever")
         
         # Reverser switch mode settings
         self.reverser_switch_mode = False
@@ -289,6 +399,157 @@ class InputMapper:
         
         # 3-way reverser mappings
         self.reverser_3way_mappings = {}  # position -> (device_id, input_type, input_index)
+        # Buttons process_reverser_switch_input has auto-assigned, as (device_id, input_index),
+        # in both directions so neither lookup scans anything
+        self._reverser_assigned: Dict[str, Tuple[int, int]] = {}
+        self._reverser_button_positions: Dict[Tuple[int, int], str] = {}
+        
+        # Per-mapping flags precomputed for the input hot path
+        self.axis_brake_functions: frozenset = frozenset()
+        # Reverse index: (device_id, input_type, input_index) -> mapped function names,
+        # limited to enabled devices once set_enabled_devices has been called
+        self.input_to_functions: Dict[Tuple[int, str, int], Tuple[str, ...]] = {}
+        self.enabled_devices: Optional[frozenset] = None
+        # Input -> first function mapped to it, across all devices (find_existing_mapping)
+        self._input_owner: Dict[Tuple[int, str, int], str] = {}
+        # Every input key the poll loop cares about (regular and reverser 3-way mappings)
+        self.active_input_keys: frozenset = frozenset()
+        self.throttle_lever_key: Optional[Tuple[int, str, int]] = None
+        self.toggle_key: Optional[Tuple[int, str, int]] = None
+        # (reverser_switch_mode, combined_throttle) -> functions dispatch_inputs skips
+        self._skip_sets: Dict[Tuple[bool, bool], frozenset] = {}
+        # Bumped on every change to state that save_mappings writes, detected by comparing
+        # it against _saved_state, its value at the last bump (see _bump_version_if_changed)
+        self.mapping_version = 0
+        self._saved_state = self._get_saved_state()
+        # Read-only get_all_mappings result and the mapping_version it was built at
+        self._all_mappings_view: Mapping[str, Tuple[int, str, int]] = MappingProxyType({})
+        self._all_mappings_version = -1
+    
+    def rebuild_reverse_index(self) -> None:
+        """Recompute the reverse index and derived mapping data; call whenever function_input_map changes
+        
+        Derived data is rebuilt into fresh objects and published by plain attribute
+        assignment, so the poll loop can iterate it without copying or locking even
+        while a mapping edit is in progress on another thread.
+        """
+        self.axis_brake_functions = frozenset(
+            name for name, (_, input_type, _) in self.function_input_map.items()
+            if input_type == 'Axis' and name in BRAKE_LEVERS
+        )
+        
+        # Duplicate mappings are allowed, so one input may drive several functions
+        enabled = self.enabled_devices
+        index: Dict[Tuple[int, str, int], Tuple[str, ...]] = {}
+        owner: Dict[Tuple[int, str, int], str] = {}
+        for name, key in self.function_input_map.items():
+            owner.setdefault(key, name)
+            if enabled is not None and key[0] not in enabled:
+                continue
+            index[key] = index.get(key, ()) + (name,)
+        self.input_to_functions = index
+        self._input_owner = owner
+        self.active_input_keys = frozenset(index).union(self.reverser_3way_mappings.values())
+        
+        # Throttle Lever input, compared against Dyn Brake Lever in combined mode
+        self.throttle_lever_key = self.function_input_map.get("Throttle Lever")
+        self.toggle_key = self.function_input_map.get("Throttle/Dyn Toggle")
+        self._skip_sets = {}
+        self._bump_version_if_changed()
+    
+    def _get_saved_state(self) -> Tuple:
+        """The state save_mappings writes, in a form that compares by value"""
+        return (
+            tuple(self.function_input_map.items()),
+            tuple(self.reverser_3way_mappings.items()),
+            frozenset(name for name, reverse in self.reverse_axis_settings.items() if reverse),
+            self.reverser_switch_mode,
+            self.reverser_two_input_mode,
+        )
+    
+    def _bump_version_if_changed(self) -> None:
+        """Bump mapping_version if the saved state differs from the last bump"""
+        state = self._get_saved_state()
+        if state != self._saved_state:
+            self._saved_state = state
+            self.mapping_version += 1
+    
+    def set_enabled_devices(self, device_ids) -> None:
+        """
+        Restrict the input dispatch index to the given devices
+        
+        Args:
+            device_ids: Iterable of enabled device ids
+        """
+        enabled = frozenset(device_ids)
+        if enabled != self.enabled_devices:
+            self.enabled_devices = enabled
+            self.rebuild_reverse_index()
+    
+    def _get_skip_set(self, reverser_switch_mode: bool, combined_throttle: bool) -> frozenset:
+        """Functions dispatch_inputs must leave to other logic under the given modes"""
+        key = (reverser_switch_mode, combined_throttle)
+        skip = self._skip_sets.get(key)
+        if skip is None:
+            names = set()
+            if reverser_switch_mode:
+                # Driven by the switch logic instead
+                names.add("Reverser Lever")
+            if combined_throttle:
+                # Handled by the caller's combined lever logic, as is a Dyn Brake Lever
+                # that shares the Throttle Lever's input
+                names.add("Throttle Lever")
+                throttle_key = self.throttle_lever_key
+                if throttle_key is not None and self.function_input_map.get("Dyn Brake Lever") == throttle_key:
+                    names.add("Dyn Brake Lever")
+            skip = self._skip_sets[key] = frozenset(names)
+        return skip
+    
+    def dispatch_inputs(self, inputs: List[Tuple[int, str, int, Any]], prev_states: Dict,
+                        emit: Callable[[int, int], None], reverser_switch_mode: bool = False,
+                        combined_throttle: bool = False) -> None:
+        """
+        Route raw inputs to their mapped functions and emit the resulting commands
+        
+        Args:
+            inputs: List of (device_id, input_type, input_index, value) tuples
+            prev_states: Per-mapping state dict used for change detection
+            emit: Called with (function_id, value) for every command produced
+            reverser_switch_mode: Skip the Reverser Lever (driven by the switch logic instead)
+            combined_throttle: Skip the levers driven by the combined throttle/dyn logic
+        """
+        # Everything the loop touches is bound to a local once per call
+        input_to_functions = self.input_to_functions
+        if not input_to_functions:
+            return
+        axis_brake_functions = self.axis_brake_functions
+        fn_get = self.function_dict.get
+        process_keyed_input = self._process_keyed_input
+        process_brake_input = self.process_brake_input
+        skip = self._get_skip_set(reverser_switch_mode, combined_throttle)
+        
+        for device_id, input_type, input_index, value in inputs:
+            # The same key tuple serves the index lookup and the handlers' prev_states
+            mapping_key = (device_id, input_type, input_index)
+            function_names = input_to_functions.get(mapping_key)
+            if function_names is None:
+                continue
+            for function_name in function_names:
+                if function_name in skip:
+                    continue
+                
+                if function_name in axis_brake_functions:
+                    function_id = fn_get(function_name)
+                    if function_id:
+                        emit(function_id, process_brake_input(function_name, value))
+                        continue
+                
+                changed, processed_value = process_keyed_input(function_name, mapping_key, value, prev_states)
+                
+                if changed:
+                    function_id = fn_get(function_name)
+                    if function_id:
+                        emit(function_id, processed_value)
     
     def load_mappings_from_csv(self, file_path: Optional[str] = None) -> bool:
         """
@@ -316,18 +577,42 @@ class InputMapper:
             self.reverser_switch_mode = False
             self.reverser_two_input_mode = False
             
-            with open(mapping_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            # One read and one decode for the whole file; mapping files are small, so
+            # this beats streaming (or mmap) and lets csv parse from memory. utf-8-sig
+            # drops the BOM spreadsheet editors add, which would otherwise hide the
+            # 'Function' column
+            with open(mapping_file, 'rb') as raw:
+                text = raw.read().decode('utf-8-sig')
+            with io.StringIO(text, newline='') as file:
+                # Positional rows: resolve each column's index from the header once.
+                # Every row is cut or padded to exactly one past the header: fields
+                # beyond the header belong to no column (as with DictReader), short
+                # rows read None, and missing columns point at the final None slot
+                reader = csv.reader(file)
+                header = next(reader, [])
+                width = len(header)
+                columns = {name: i for i, name in enumerate(header)}
+                fi, di, ti, ii, ri = (columns.get(name, width)
+                                      for name in ('Function', 'Device', 'Type', 'Index', 'Reverse'))
+                padding = [None] * (width + 1)
                 loaded_mappings = 0
                 loaded_reverser_mappings = 0
                 loaded_new_reverser_mode = False  # Track if we found the new format
+                function_input_map = self.function_input_map
+                reverse_axis_settings = self.reverse_axis_settings
+                debug = logger.isEnabledFor(logging.DEBUG)
                 
                 for row in reader:
-                    function_name = row.get('Function')
-                    device_id = row.get('Device')
-                    input_type = row.get('Type')
-                    input_index = row.get('Index')
-                    reverse_axis = row.get('Reverse', 'False')
+                    if not row:
+                        continue  # Blank line
+                    if len(row) > width:
+                        del row[width:]
+                    row += padding[len(row):]
+                    function_name = row[fi]
+                    device_id = row[di]
+                    input_type = row[ti]
+                    input_index = row[ii]
+                    reverse_axis = row[ri]
 
                     # Handle new reverser mode format (preferred)
                     if function_name == '__REVERSER_MODE__':
@@ -367,39 +652,39 @@ class InputMapper:
                             if device_id and input_index and input_type:
                                 device_id_int = int(device_id)
                                 input_index_int = int(input_index)
-                                self.set_reverser_3way_mapping(pos, device_id_int, str(input_type), input_index_int)
+                                self.set_reverser_3way_mapping(pos, device_id_int, input_type, input_index_int)
                                 loaded_reverser_mappings += 1
-                                logger.debug(f"Loaded reverser 3-way mapping: {pos} -> {device_id_int}:{input_type}:{input_index_int}")
+                                if debug:
+                                    logger.debug("Loaded reverser 3-way mapping: %s -> %s:%s:%s",
+                                                 pos, device_id_int, input_type, input_index_int)
                         except (ValueError, TypeError) as e:
                             logger.error(f"Invalid reverser 3-way mapping for {pos}: {e}")
                         continue
 
-                    # Handle regular function mappings
-                    if all([function_name, device_id is not None, input_type, input_index is not None]):
+                    # Handle regular function mappings (csv yields str, or None for a short row)
+                    if function_name and device_id is not None and input_type and input_index is not None:
                         try:
-                            function_name_str = str(function_name).strip()
-                            input_type_str = str(input_type).strip()
-                            input_index_int = int(input_index)
-                            device_id_int = int(device_id)
-                            
-                            self.function_input_map[function_name_str] = (
-                                device_id_int, 
-                                input_type_str, 
-                                input_index_int
-                            )
-                            self.reverse_axis_settings[function_name_str] = str(reverse_axis).lower() == 'true'
+                            function_name_str = function_name.strip()
+                            mapping = _mapping_entry(int(device_id), input_type.strip(), int(input_index))
+                            reverse = str(reverse_axis).lower() == 'true'
+                            function_input_map[function_name_str] = mapping
+                            reverse_axis_settings[function_name_str] = reverse
                             loaded_mappings += 1
-                            logger.debug(f"Loaded mapping: {function_name_str} -> {device_id_int}:{input_type_str}:{input_index_int} (reverse: {self.reverse_axis_settings[function_name_str]})")
+                            if debug:
+                                logger.debug("Loaded mapping: %s -> %s:%s:%s (reverse: %s)",
+                                             function_name_str, *mapping, reverse)
                         except (ValueError, TypeError) as e:
                             logger.error(f"Invalid mapping data for {function_name}: {e}")
                     elif function_name and not function_name.startswith('__'):
                         logger.warning(f"Skipping incomplete mapping for {function_name}: device={device_id}, type={input_type}, index={input_index}")
 
+            self.rebuild_reverse_index()
             logger.info(f"Loaded {loaded_mappings} regular mappings and {loaded_reverser_mappings} reverser 3-way mappings from {mapping_file}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to load mappings from {mapping_file}: {e}")
+            self.rebuild_reverse_index()
             return False
     
     def save_mappings(self, file_path: Optional[str] = None) -> bool:
@@ -409,88 +694,96 @@ class InputMapper:
         Args:
             file_path: Optional path to the CSV file. If None, uses default mapping file
         
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        return self.write_mappings_snapshot(self.get_mappings_snapshot(), file_path)
+    
+    def get_mappings_snapshot(self) -> Dict[str, Any]:
+        """
+        Copy everything save_mappings writes into plain containers
+        
+        Returns:
+            Snapshot dict that write_mappings_snapshot can serialize from any thread
+        """
+        return {
+            'mappings': list(self.function_input_map.items()),
+            'reverse': dict(self.reverse_axis_settings),
+            'reverser_3way': dict(self.reverser_3way_mappings),
+            'reverser_switch_mode': self.reverser_switch_mode,
+            'reverser_two_input_mode': self.reverser_two_input_mode,
+            'version': self.mapping_version,
+        }
+    
+    def write_mappings_snapshot(self, snapshot: Dict[str, Any], file_path: Optional[str] = None) -> bool:
+        """
+        Write a snapshot from get_mappings_snapshot to a CSV file
+        
+        Args:
+            snapshot: Mapping snapshot to serialize
+            file_path: Optional path to the CSV file. If None, uses default mapping file
+        
         Returns:
             True if saved successfully, False otherwise
         """
         mapping_file = file_path if file_path else self.mapping_file
+        reverse_axis_settings = snapshot['reverse']
+        reverser_switch_mode = snapshot['reverser_switch_mode']
         
         try:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(mapping_file), exist_ok=True)
             
-            with open(mapping_file, 'w', newline='', encoding='utf-8') as file:
-                fieldnames = ['Function', 'Device', 'Type', 'Index', 'Reverse']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                saved_mappings = 0
-                saved_reverser_mappings = 0
-                
-                # Save regular mappings
-                for function_name, (device_id, input_type, input_index) in self.function_input_map.items():
-                    try:
-                        writer.writerow({
-                            'Function': function_name,
-                            'Device': device_id,
-                            'Type': input_type,
-                            'Index': input_index,
-                            'Reverse': self.reverse_axis_settings.get(function_name, False)
-                        })
-                        saved_mappings += 1
-                    except Exception as e:
-                        logger.error(f"Failed to save mapping for {function_name}: {e}")
-                        
-                # Save reverser 3-way switch mappings if present
-                if hasattr(self, 'reverser_3way_mappings') and self.reverser_3way_mappings:
-                    for pos, mapping in self.reverser_3way_mappings.items():
-                        try:
-                            device_id, input_type, input_index = mapping
-                            writer.writerow({
-                                'Function': f'__REVERSER_3WAY_{pos.upper()}__',
-                                'Device': device_id,
-                                'Type': input_type,
-                                'Index': input_index,
-                                'Reverse': ''
-                            })
-                            saved_reverser_mappings += 1
-                        except Exception as e:
-                            logger.error(f"Failed to save reverser 3-way mapping for {pos}: {e}")
-                        
-                # Save reverser mode configuration as special rows
-                # Determine the string mode to save
+            # Serialize everything in memory, then write it in one go to a temp file
+            # next to the target and swap it in, so a failed save never leaves a
+            # truncated mapping file behind
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(('Function', 'Device', 'Type', 'Index', 'Reverse'))
+            
+            # Save regular mappings
+            mappings = snapshot['mappings']
+            writer.writerows([
+                (function_name, device_id, input_type, input_index,
+                 reverse_axis_settings.get(function_name, False))
+                for function_name, (device_id, input_type, input_index) in mappings
+            ])
+            saved_mappings = len(mappings)
+            
+            # Save reverser 3-way switch mappings if present
+            saved_reverser_mappings = 0
+            for pos, mapping in snapshot['reverser_3way'].items():
                 try:
-                    if self.reverser_switch_mode:
-                        if getattr(self, 'reverser_two_input_mode', False):
-                            mode_string = '2way'
-                        else:
-                            mode_string = '3way'
-                    else:
-                        mode_string = 'axis'
-                        
-                    writer.writerow({
-                        'Function': '__REVERSER_MODE__',
-                        'Device': mode_string,
-                        'Type': '',
-                        'Index': '',
-                        'Reverse': ''
-                    })
-                    logger.debug(f"Saved reverser mode: {mode_string}")
-                    
-                    # Also save the legacy format for backward compatibility
-                    writer.writerow({
-                        'Function': '__REVERSER_SWITCH_MODE__',
-                        'Device': '',
-                        'Type': '',
-                        'Index': '',
-                        'Reverse': self.reverser_switch_mode
-                    })
-                    logger.debug(f"Saved legacy reverser switch mode: {self.reverser_switch_mode}")
-                    
+                    device_id, input_type, input_index = mapping
+                    writer.writerow((f'__REVERSER_3WAY_{pos.upper()}__', device_id, input_type, input_index, ''))
+                    saved_reverser_mappings += 1
                 except Exception as e:
-                    logger.error(f"Failed to save reverser mode configuration: {e}")
+                    logger.error(f"Failed to save reverser 3-way mapping for {pos}: {e}")
+            
+            # Save reverser mode configuration as special rows
+            # Determine the string mode to save
+            if reverser_switch_mode:
+                mode_string = '2way' if snapshot['reverser_two_input_mode'] else '3way'
+            else:
+                mode_string = 'axis'
+            writer.writerow(('__REVERSER_MODE__', mode_string, '', '', ''))
+            # Also save the legacy format for backward compatibility
+            writer.writerow(('__REVERSER_SWITCH_MODE__', '', '', '', reverser_switch_mode))
+            
+            temp_file = mapping_file + '.tmp'
+            try:
+                with open(temp_file, 'w', newline='', encoding='utf-8') as file:
+                    file.write(buffer.getvalue())
+                os.replace(temp_file, mapping_file)
+            except Exception:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+                raise
                     
             logger.info(f"Saved {saved_mappings} regular mappings and {saved_reverser_mappings} reverser 3-way mappings to {mapping_file}")
-            logger.info(f"Reverser mode: {'3way' if self.reverser_switch_mode and not getattr(self, 'reverser_two_input_mode', False) else '2way' if self.reverser_switch_mode else 'axis'}")
+            logger.info(f"Reverser mode: {mode_string}")
             return True
             
         except Exception as e:
@@ -514,7 +807,8 @@ class InputMapper:
             logger.error(f"Unknown function: {function_name}")
             return False
         
-        self.function_input_map[function_name] = (device_id, input_type, input_index)
+        self.function_input_map[function_name] = _mapping_entry(device_id, input_type, input_index)
+        self.rebuild_reverse_index()
         logger.info(f"Added mapping: {function_name} -> {device_id}:{input_type}:{input_index}")
         return True
     
@@ -532,18 +826,16 @@ class InputMapper:
             del self.function_input_map[function_name]
             if function_name in self.reverse_axis_settings:
                 del self.reverse_axis_settings[function_name]
+            self.rebuild_reverse_index()
             logger.info(f"Removed mapping for {function_name}")
             removed = True
         # Remove from reverser 3-way mappings if function_name matches
-        if function_name.startswith("Reverser 3way"):
-            # function_name is like 'Reverser 3way forward', 'Reverser 3way neutral', etc.
-            parts = function_name.split()
-            if len(parts) == 3:
-                pos = parts[2].lower()
-                if hasattr(self, 'reverser_3way_mappings') and pos in self.reverser_3way_mappings:
-                    del self.reverser_3way_mappings[pos]
-                    logger.info(f"Removed reverser 3-way mapping for {pos}")
-                    removed = True
+        pos = REVERSER_3WAY_POSITIONS.get(function_name)
+        if pos is not None and pos in self.reverser_3way_mappings:
+            del self.reverser_3way_mappings[pos]
+            self.rebuild_reverse_index()
+            logger.info(f"Removed reverser 3-way mapping for {pos}")
+            removed = True
         return removed
     
     def get_mapping(self, function_name: str) -> Optional[Tuple[int, str, int]]:
@@ -567,6 +859,7 @@ class InputMapper:
             reverse: Whether to reverse the axis
         """
         self.reverse_axis_settings[function_name] = reverse
+        self._bump_version_if_changed()
         logger.debug(f"Set axis reverse for {function_name}: {reverse}")
     
     def get_axis_reverse(self, function_name: str) -> bool:
@@ -596,204 +889,183 @@ class InputMapper:
         Returns:
             Tuple of (value_changed, processed_value)
         """
-        mapping_key = (device_id, input_type, input_index)
-        input_behavior = FunctionMapping.INPUT_TYPES.get(function_name, 'toggle')
-
-        # Reverser input mode selection: axis OR 3-way switch, never both
-        if function_name == 'Reverser Lever':
-            if self.get_reverser_switch_mode():
-                # 3-way switch mode: always pass the current reverser value to the simulator
-                # regardless of whether an axis is mapped or not
-                return True, self.get_reverser_command_value()
-            else:
-                # Axis mode: only process axis, ignore buttons/hats
-                if input_type == 'Axis':
-                    return self._process_lever_input(function_name, input_type, raw_value, mapping_key, prev_states)
-                else:
-                    return False, 0
+        return self._process_keyed_input(function_name, (device_id, input_type, input_index), raw_value, prev_states)
+    
+    def _process_keyed_input(self, function_name: str, mapping_key: Tuple[int, str, int],
+                             raw_value: Any, prev_states: Dict) -> Tuple[bool, int]:
+        """process_input_value for an input already given as its (device_id, input_type, input_index) key"""
+        # Reverser input mode selection: axis OR 3-way switch, never both. In 3-way
+        # switch mode always pass the current reverser value to the simulator,
+        # regardless of whether an axis is mapped or not; in axis mode the reverser
+        # is a lever and only its axis is processed
+        if function_name == 'Reverser Lever' and self.reverser_switch_mode:
+            return True, self.get_reverser_command_value()
 
-        if input_behavior == 'lever':
-            return self._process_lever_input(function_name, input_type, raw_value, mapping_key, prev_states)
-        elif input_type == "Button":
-            return self._process_button_input(function_name, raw_value, mapping_key, prev_states, input_behavior)
-        elif input_type == "Axis" and input_behavior not in ('lever',):
-            return self._process_axis_input(function_name, raw_value, mapping_key, prev_states, input_behavior)
-        elif input_type == "Hat":
-            return self._process_hat_input(function_name, raw_value, mapping_key, prev_states, input_behavior)
-        return False, 0
+        input_type = mapping_key[1]
+        handler = self._handlers.get((function_name, input_type))
+        if handler is None:
+            handler = self._handlers[(function_name, input_type)] = self._make_handler(function_name, input_type)
+        return handler(raw_value, mapping_key, prev_states)
     
-    def _process_lever_input(self, function_name: str, input_type: str, raw_value: float, 
-                            mapping_key: Tuple, prev_states: Dict) -> Tuple[bool, int]:
-        """Process lever input (throttle, brake, reverser)"""
-        if input_type != 'Axis':
-            return False, 0
+    def _make_handler(self, function_name: str, input_type: str) -> Callable[[Any, Tuple, Dict], Tuple[bool, int]]:
+        """
+        Build the input handler specialized for one function and input type
         
-        axis_val = raw_value
-        if self.get_axis_reverse(function_name):
-            axis_val = -axis_val
+        Behavior and lever kind are fixed per function, so they are resolved here once
+        instead of on every sample. Handlers take (raw_value, mapping_key, prev_states).
+        """
+        input_behavior = self._behavior_cache.get(function_name, 'toggle')
+        if input_behavior == 'lever':
+            # Levers only take axes; buttons/hats mapped to a lever do nothing
+            return self._make_lever_handler(function_name) if input_type == 'Axis' else _ignore_input
+        process = self._dispatch.get((input_behavior, input_type))
+        if process is None:
+            return _ignore_input
+        behavior_code = _BEHAVIOR_CODES.get(input_behavior, _OTHER)
         
-        axis_val = max(-1.0, min(1.0, axis_val))
+        def handler(raw_value, mapping_key, prev_states):
+            return process(function_name, raw_value, mapping_key, prev_states, behavior_code)
+        return handler
+    
+    def _make_lever_handler(self, function_name: str) -> Callable[[Any, Tuple, Dict], Tuple[bool, int]]:
+        """Build the axis handler for a lever (throttle, brake, reverser)"""
+        reverse_of = self.reverse_axis_settings
         
+        # axis values are clamped to [-1, 1], so the scaled results are already in range
         if function_name == 'Throttle Lever':
-            notch = int(round(((axis_val + 1.0) / 2.0) * 8))
-            notch = max(0, min(8, notch))
-            prev_notch = prev_states.get(mapping_key, -1)
-            if notch != prev_notch:
-                prev_states[mapping_key] = notch
-                return True, notch
-                
-        elif function_name == 'Reverser Lever':
-            # Get axis value (handle reverse setting)
-            axis_val = -raw_value if self.reverse_axis_settings.get(function_name, False) else raw_value
-            
-            # Precise reverser control with clear regions for reverse/neutral/forward
-            if axis_val < -0.8:  # Reverse position - more definitive threshold
-                reverser_val = 0
-                position = "reverse"
-            elif axis_val > 0.8:  # Forward position - more definitive threshold
-                reverser_val = 255
-                position = "forward"
-            else:  # Neutral position - wider center region for stability
-                reverser_val = 127
-                position = "neutral"
-            
-            # Check if value changed since last update
-            prev_reverser = prev_states.get(mapping_key, None)
-            if reverser_val != prev_reverser:
-                prev_states[mapping_key] = reverser_val
-                logger.info(f"Lever reverser: position={position}, value={reverser_val}, axis={axis_val:.2f}")
-                return True, reverser_val
-                
-        elif function_name in ('Independent Brake Lever', 'Train Brake Lever', 'Dyn Brake Lever'):
-            # Brake levers: Use full range from -1 to 1, mapping to 0-255.
-            # Reverse axis setting is handled before this.
-            # Map -1.0 to 1.0 -> 0 to 255
-            brake_val = int(((axis_val + 1.0) / 2.0) * 255)
-            brake_val = max(0, min(255, brake_val))
-
-            prev_brake = prev_states.get(mapping_key, -1)
-            if brake_val != prev_brake:
-                prev_states[mapping_key] = brake_val
-                logger.info(f"Brake {function_name} changed to: {brake_val} (axis: {axis_val:.3f})")
-                return True, brake_val
+            def handle_throttle(raw_value, mapping_key, prev_states):
+                notch = _throttle_notch(_lever_axis(raw_value, reverse_of.get(function_name, False)))
+                if notch != prev_states.get(mapping_key, -1):
+                    prev_states[mapping_key] = notch
+                    return True, notch
+                return False, 0
+            return handle_throttle
         
-        return False, 0
+        if function_name == 'Reverser Lever':
+            def handle_reverser(raw_value, mapping_key, prev_states):
+                # Precise reverser control with clear regions for reverse/neutral/forward
+                axis_val = _lever_axis(raw_value, reverse_of.get(function_name, False))
+                reverser_val = _reverser_lever_value(axis_val)
+                if reverser_val != prev_states.get(mapping_key, None):
+                    prev_states[mapping_key] = reverser_val
+                    logger.info("Lever reverser: position=%s, value=%d, axis=%.2f",
+                                _REVERSER_VALUE_POSITIONS[reverser_val], reverser_val, axis_val)
+                    return True, reverser_val
+                return False, 0
+            return handle_reverser
+        
+        if function_name in BRAKE_LEVERS:
+            def handle_brake(raw_value, mapping_key, prev_states):
+                # Brake levers: full -1..1 travel maps to 0-255 (reverse already applied)
+                axis_val = _lever_axis(raw_value, reverse_of.get(function_name, False))
+                brake_val = _brake_value(axis_val)
+                if brake_val != prev_states.get(mapping_key, -1):
+                    prev_states[mapping_key] = brake_val
+                    logger.info("Brake %s changed to: %d (axis: %.3f)", function_name, brake_val, axis_val)
+                    return True, brake_val
+                return False, 0
+            return handle_brake
+        
+        return _ignore_input
     
     def _process_button_input(self, function_name: str, raw_value: int, mapping_key: Tuple, 
-                             prev_states: Dict, input_behavior: str) -> Tuple[bool, int]:
+                             prev_states: Dict, behavior_code: int) -> Tuple[bool, int]:
         """Process button input"""
         current_pressed = bool(raw_value)
         prev_pressed = prev_states.get(mapping_key, False)
         
-        if function_name in self.multiway_states and input_behavior in ('3way', '4way'):
-            num_states = 3 if input_behavior == '3way' else 4
+        num_states = _MULTIWAY_CODE_STATE_COUNTS.get(behavior_code)
+        if num_states is not None and function_name in self.multiway_states:
             if current_pressed and not prev_pressed:
-                self.multiway_states[function_name] = (self.multiway_states[function_name] + 1) % num_states
-                value = self.multiway_states[function_name]
+                multiway_states = self.multiway_states
+                value = multiway_states[function_name] = (multiway_states[function_name] + 1) % num_states
                 prev_states[mapping_key] = current_pressed
                 return True, value
                 
-        elif input_behavior == 'momentary':
+        elif behavior_code == _MOMENTARY:
             if current_pressed != prev_pressed:
                 prev_states[mapping_key] = current_pressed
                 return True, 1 if current_pressed else 0
                 
-        elif input_behavior == 'toggle':
+        elif behavior_code == _TOGGLE:
             if current_pressed and not prev_pressed:
                 prev_states[mapping_key] = current_pressed
                 return True, 1
         
-        prev_states[mapping_key] = current_pressed
+        # Nothing to report; only touch prev_states if the button actually moved
+        if current_pressed != prev_pressed:
+            prev_states[mapping_key] = current_pressed
         return False, 0
     
     def _process_axis_input(self, function_name: str, raw_value: float, mapping_key: Tuple, 
-                           prev_states: Dict, input_behavior: str) -> Tuple[bool, int]:
+                           prev_states: Dict, behavior_code: int) -> Tuple[bool, int]:
         """Process axis input for non-lever functions"""
         prev_value = prev_states.get(mapping_key, 0.0)
         
-        if input_behavior == 'momentary':
+        if behavior_code == _MOMENTARY:
             current_active = abs(raw_value) > DEADZONE
             prev_active = abs(prev_value) > DEADZONE
             if current_active != prev_active:
                 prev_states[mapping_key] = raw_value
                 return True, 1 if current_active else 0
                 
-        elif input_behavior == 'toggle':
+        elif behavior_code == _TOGGLE:
             current_active = abs(raw_value) > DEADZONE
             prev_active = abs(prev_value) > DEADZONE
             if current_active and not prev_active:
                 prev_states[mapping_key] = raw_value
                 return True, 1
         
-        prev_states[mapping_key] = raw_value
+        if raw_value != prev_value:
+            prev_states[mapping_key] = raw_value
         return False, 0
     
     def _process_hat_input(self, function_name: str, raw_value: Tuple[int, int], mapping_key: Tuple, 
-                          prev_states: Dict, input_behavior: str) -> Tuple[bool, int]:
+                          prev_states: Dict, behavior_code: int) -> Tuple[bool, int]:
         """Process hat input"""
         prev_value = prev_states.get(mapping_key, (0, 0))
         
-        if input_behavior == 'momentary':
-            current_active = raw_value != (0, 0)
-            prev_active = prev_value != (0, 0)
+        if behavior_code == _MOMENTARY:
+            current_active = _HAT_ACTIVE.get(raw_value, True)
+            prev_active = _HAT_ACTIVE.get(prev_value, True)
             if current_active != prev_active:
                 prev_states[mapping_key] = raw_value
                 return True, 1 if current_active else 0
                 
-        elif input_behavior == 'toggle':
-            current_active = raw_value != (0, 0)
-            prev_active = prev_value != (0, 0)
+        elif behavior_code == _TOGGLE:
+            current_active = _HAT_ACTIVE.get(raw_value, True)
+            prev_active = _HAT_ACTIVE.get(prev_value, True)
             if current_active and not prev_active:
                 prev_states[mapping_key] = raw_value
                 return True, 1
                 
-        elif input_behavior == '3way':
+        elif behavior_code == _THREE_WAY:
             # 3-way switch: Down=0, Center=1, Up=2
-            # Hat values: (0, -1) = Down, (0, 0) = Center, (0, 1) = Up
-            if raw_value == (0, -1):  # Down
-                new_value = 0
-            elif raw_value == (0, 0):  # Center
-                new_value = 1
-            elif raw_value == (0, 1):  # Up
-                new_value = 2
-            else:
-                # Handle diagonal hat positions by using dominant direction
-                if raw_value[1] > 0:  # Any upward component
-                    new_value = 2
-                elif raw_value[1] < 0:  # Any downward component
-                    new_value = 0
-                else:  # Horizontal or unknown
-                    new_value = 1
+            new_value = _HAT_3WAY_POSITIONS.get(raw_value)
+            if new_value is None:
+                # Not a plain -1/0/1 reading: go by the sign of the vertical component
+                new_value = 2 if raw_value[1] > 0 else (0 if raw_value[1] < 0 else 1)
             
             # Get previous 3-way value
-            prev_3way_value = getattr(self, f'_last_3way_{function_name}', 1)  # Default to center
+            prev_3way_value = self._hat_switch_positions.get(function_name, 1)  # Default to center
             if new_value != prev_3way_value:
-                setattr(self, f'_last_3way_{function_name}', new_value)
+                self._hat_switch_positions[function_name] = new_value
                 prev_states[mapping_key] = raw_value
                 return True, new_value
                 
-        elif input_behavior == '4way':
-            # 4-way switch: positions 0, 1, 2, 3
-            # Hat values: (0, -1) = 0, (-1, 0) = 1, (0, 1) = 2, (1, 0) = 3, (0, 0) = center/default
-            if raw_value == (0, -1):  # Down
-                new_value = 0
-            elif raw_value == (-1, 0):  # Left
-                new_value = 1
-            elif raw_value == (0, 1):  # Up
-                new_value = 2
-            elif raw_value == (1, 0):  # Right
-                new_value = 3
-            else:
-                new_value = 0  # Default to first position
+        elif behavior_code == _FOUR_WAY:
+            # 4-way switch: positions 0, 1, 2, 3; center and diagonals default to the first
+            new_value = _HAT_4WAY_POSITIONS.get(raw_value, 0)
             
             # Get previous 4-way value
-            prev_4way_value = getattr(self, f'_last_4way_{function_name}', 0)  # Default to first position
+            prev_4way_value = self._hat_switch_positions.get(function_name, 0)  # Default to first position
             if new_value != prev_4way_value:
-                setattr(self, f'_last_4way_{function_name}', new_value)
+                self._hat_switch_positions[function_name] = new_value
                 prev_states[mapping_key] = raw_value
                 return True, new_value
         
-        prev_states[mapping_key] = raw_value
+        if raw_value != prev_value:
+            prev_states[mapping_key] = raw_value
         return False, 0
     
     def process_reverser_switch_input(self, device_id, input_type, input_index, value, states):
@@ -805,7 +1077,8 @@ class InputMapper:
             input_type: Type of input (Button, Axis, Hat)
             input_index: Index of the input
             value: Current input value
-            states: Dictionary of current states
+            states: Dictionary of current states (unused; button assignments are kept
+                on the mapper)
             
         Returns:
             tuple: (changed, value) - Whether the state changed and the new value
@@ -819,44 +1092,23 @@ class InputMapper:
                 return False, self.reverser_positions[self.reverser_state]
             
             # Check if this button is mapped to a specific position
-            forward_key = f"reverser_switch_forward_{device_id}_{input_index}"
-            neutral_key = f"reverser_switch_neutral_{device_id}_{input_index}"
-            reverse_key = f"reverser_switch_reverse_{device_id}_{input_index}"
-            
-            # First time setup for buttons if they don't exist in states
-            if not any(k.startswith(f"reverser_switch_") for k in states):
-                # This is the first button, map it to forward
-                states[forward_key] = True
-                self.reverser_state = "forward"
-                return True, self.reverser_positions["forward"]
-            elif forward_key not in states and neutral_key not in states and reverse_key not in states:
-                # This is a new button, find a position that's not mapped yet
-                if not any(k.startswith("reverser_switch_forward") for k in states):
-                    states[forward_key] = True
-                    self.reverser_state = "forward"
-                    return True, self.reverser_positions["forward"]
-                elif not any(k.startswith("reverser_switch_neutral") for k in states):
-                    states[neutral_key] = True
-                    self.reverser_state = "neutral"
-                    return True, self.reverser_positions["neutral"]
-                elif not any(k.startswith("reverser_switch_reverse") for k in states):
-                    states[reverse_key] = True
-                    self.reverser_state = "reverse"
-                    return True, self.reverser_positions["reverse"]
+            button = (device_id, input_index)
+            position = self._reverser_button_positions.get(button)
+            if position is None:
+                # New button: give it the first position not assigned yet
+                # (forward, then neutral, then reverse); ignore it once all are taken
+                for position in REVERSER_POSITIONS:
+                    if position not in self._reverser_assigned:
+                        self._reverser_assigned[position] = button
+                        self._reverser_button_positions[button] = position
+                        self.reverser_state = position
+                        return True, self.reverser_positions[position]
+                return False, self.reverser_positions[self.reverser_state]
             
             # Handle already mapped buttons
-            if forward_key in states:
-                if self.reverser_state != "forward":
-                    self.reverser_state = "forward"
-                    changed = True
-            elif neutral_key in states:
-                if self.reverser_state != "neutral":
-                    self.reverser_state = "neutral"
-                    changed = True
-            elif reverse_key in states:
-                if self.reverser_state != "reverse":
-                    self.reverser_state = "reverse"
-                    changed = True
+            if self.reverser_state != position:
+                self.reverser_state = position
+                changed = True
                     
         elif input_type == "Hat":
             # For hat switches: up for forward, center for neutral, down for reverse
@@ -888,6 +1140,7 @@ class InputMapper:
             self.reverser_two_input_mode = False
         else:
             raise ValueError("Invalid reverser mode: {}".format(mode))
+        self._bump_version_if_changed()
     
     def get_reverser_switch_mode(self):
         """Get the current reverser switch mode"""
@@ -896,7 +1149,7 @@ class InputMapper:
     def get_current_mode_string(self) -> str:
         """Get the current reverser mode as a string for debugging"""
         if self.reverser_switch_mode:
-            if getattr(self, 'reverser_two_input_mode', False):
+            if self.reverser_two_input_mode:
                 return '2way'
             else:
                 return '3way'
@@ -912,8 +1165,8 @@ class InputMapper:
                     logger.warning(f"Mapping found for unknown function: {function_name}")
             
             # Check reverser 3-way mappings if in switch mode
-            if self.reverser_switch_mode and hasattr(self, 'reverser_3way_mappings'):
-                expected_positions = ['forward', 'neutral', 'reverse'] if not getattr(self, 'reverser_two_input_mode', False) else ['forward', 'reverse']
+            if self.reverser_switch_mode:
+                expected_positions = ['forward', 'neutral', 'reverse'] if not self.reverser_two_input_mode else ['forward', 'reverse']
                 for pos in expected_positions:
                     if pos not in self.reverser_3way_mappings:
                         logger.warning(f"Missing reverser 3-way mapping for position: {pos}")
@@ -927,36 +1180,29 @@ class InputMapper:
     # --- Reverser 3-way switch support ---
     def set_reverser_3way_mapping(self, position: str, device_id: int, input_type: str, input_index: int):
         """Set the mapping for a reverser 3-way switch position ('forward', 'neutral', 'reverse')."""
-        if not hasattr(self, 'reverser_3way_mappings'):
-            self.reverser_3way_mappings = {}
-        self.reverser_3way_mappings[position] = (device_id, input_type, input_index)
+        self.reverser_3way_mappings[position] = _mapping_entry(device_id, input_type, input_index)
+        self.rebuild_reverse_index()
         logger.info(f"Set reverser 3-way mapping: {position} -> {device_id}:{input_type}:{input_index}")
 
     def get_reverser_3way_mapping(self, position: str):
         """Get the mapping for a reverser 3-way switch position."""
-        if hasattr(self, 'reverser_3way_mappings'):
-            mapping = self.reverser_3way_mappings.get(position)
-            if mapping is None:
-                logger.warning(f"No mapping found for Reverser 3way {position}")
-            return mapping
-        logger.warning(f"No mapping found for Reverser 3way {position}")
-        return None
+        mapping = self.reverser_3way_mappings.get(position)
+        if mapping is None:
+            logger.warning(f"No mapping found for Reverser 3way {position}")
+        return mapping
 
     def clear_reverser_3way_mapping(self, position: str):
         """Clear the mapping for a reverser 3-way switch position."""
-        if hasattr(self, 'reverser_3way_mappings') and position in self.reverser_3way_mappings:
+        if position in self.reverser_3way_mappings:
             del self.reverser_3way_mappings[position]
+            self.rebuild_reverse_index()
 
     def get_all_reverser_3way_mappings(self):
         """Return all 3-way switch mappings as a dict."""
-        if hasattr(self, 'reverser_3way_mappings'):
-            return dict(self.reverser_3way_mappings)
-        return {}
+        return dict(self.reverser_3way_mappings)
 
     def process_reverser_3way_input(self, device_id: int, input_type: str, input_index: int, value: Any) -> Optional[str]:
         """Return 'forward', 'neutral', or 'reverse' if the input matches a mapped 3-way switch and is active."""
-        if not hasattr(self, 'reverser_3way_mappings'):
-            return None
         for pos, mapping in self.reverser_3way_mappings.items():
             if mapping == (device_id, input_type, input_index):
                 # For buttons, value==1 means pressed
@@ -967,23 +1213,33 @@ class InputMapper:
                     return pos
         return None
     
-    def get_all_mappings(self) -> Dict[str, Tuple[int, str, int]]:
-        """Get all current mappings, including reverser 3-way mappings"""
-        all_mappings = self.function_input_map.copy()
+    def get_all_mappings(self) -> Mapping[str, Tuple[int, str, int]]:
+        """
+        Get all current mappings, including reverser 3-way mappings
         
-        # Add reverser 3-way mappings with special naming
-        if hasattr(self, 'reverser_3way_mappings'):
+        Returns:
+            Read-only view shared between calls and rebuilt only after the mappings
+            change (mapping_version); a view already handed out is never modified
+        """
+        if self._all_mappings_version != self.mapping_version:
+            all_mappings = self.function_input_map.copy()
+            
+            # Add reverser 3-way mappings with special naming
             for position, mapping in self.reverser_3way_mappings.items():
-                all_mappings[f"Reverser 3way {position}"] = mapping
-        
-        return all_mappings
+                all_mappings[REVERSER_3WAY_FUNCTIONS[position]] = mapping
+            
+            self._all_mappings_view = MappingProxyType(all_mappings)
+            self._all_mappings_version = self.mapping_version
+        return self._all_mappings_view
     
     def clear_all_mappings(self) -> None:
         """Clear all mappings, including reverser 3-way mappings"""
         self.function_input_map.clear()
         self.reverse_axis_settings.clear()
-        if hasattr(self, 'reverser_3way_mappings'):
-            self.reverser_3way_mappings.clear()
+        self.reverser_3way_mappings.clear()
+        self._reverser_assigned.clear()
+        self._reverser_button_positions.clear()
+        self.rebuild_reverse_index()
         logger.info("Cleared all mappings (including reverser 3-way)")
     
     def get_mapped_functions(self) -> List[str]:
@@ -991,10 +1247,9 @@ class InputMapper:
         return list(self.function_input_map.keys())
     
     def get_unmapped_functions(self) -> List[str]:
-        """Get list of functions that don't have mappings"""
-        all_functions = set(self.function_dict.keys())
-        mapped_functions = set(self.function_input_map.keys())
-        return list(all_functions - mapped_functions)
+        """Get list of functions that don't have mappings, in function table order"""
+        function_input_map = self.function_input_map
+        return [name for name in self.function_dict if name not in function_input_map]
     
     def process_reverser_lever_axis(self, value: float) -> int:
         """
@@ -1013,13 +1268,13 @@ class InputMapper:
             # Forward
             # Scale from 0.2->1.0 to 128->255
             reverser_val = int(127 + (value - 0.2) * 160)
-            reverser_val = min(255, max(128, reverser_val))
+            reverser_val = 128 if reverser_val < 128 else (255 if reverser_val > 255 else reverser_val)
             state_name = "forward"
         else:
             # Reverse
             # Scale from -0.2->-1.0 to 126->0
             reverser_val = int(127 - (abs(value) - 0.2) * 160)
-            reverser_val = min(126, max(0, reverser_val))
+            reverser_val = 0 if reverser_val < 0 else (126 if reverser_val > 126 else reverser_val)
             state_name = "reverse"
         
         logger.info(f"Reverser lever: axis={value:.2f}, state={state_name}, value={reverser_val}")
@@ -1064,7 +1319,7 @@ class InputMapper:
             brake_val = int(((value + 1.0) / 2.0) * 255)
         
         # Ensure value stays in valid range
-        brake_val = max(0, min(255, brake_val))
+        brake_val = 0 if brake_val < 0 else (255 if brake_val > 255 else brake_val)
         
         # Enhanced logging to show raw input vs processed output
         logger.info(f"Brake {function_name}: raw_axis={original_value:.3f}, processed_axis={value:.3f}, final_value={brake_val} (range: 0=release, 255=emergency)")
@@ -4,16 +4,87 @@ UDP networking module for Run8 Control Conductor
 Handles UDP socket communication with the Run8 train simulator.
 """
 
+import ctypes
+import ctypes.util
+import errno
+import os
 import socket
 import struct
+import sys
 import time
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of datagrams handed to a single sendmmsg call
+MAX_BATCH_SIZE = 64
+
+# Kernel send buffer requested for the client socket (bytes)
+SEND_BUFFER_SIZE = 1 << 20
+
+# IP type-of-service for control packets (IPTOS_LOWDELAY)
+IP_TOS_LOW_DELAY = 0x10
+
+# Run8 wire format: header (uchar), message type (ushort), value (uchar), XOR CRC (uchar)
+PACKET = struct.Struct(">BHBB")
+
+
+# --- Linux sendmmsg support (one syscall for a whole batch of packets) ---
+class _IOVec(ctypes.Structure):
+    _fields_ = [
+        ('iov_base', ctypes.c_void_p),
+        ('iov_len', ctypes.c_size_t),
+    ]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_IOVec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_hdr', _MsgHdr),
+        ('msg_len', ctypes.c_uint),
+    ]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ('sin_family', ctypes.c_ushort),
+        ('sin_port', ctypes.c_ubyte * 2),   # network byte order
+        ('sin_addr', ctypes.c_ubyte * 4),   # network byte order
+        ('sin_zero', ctypes.c_ubyte * 8),
+    ]
+
+
+def _load_sendmmsg():
+    """Return libc's sendmmsg function, or None if unavailable on this platform"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        func = libc.sendmmsg
+        func.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+        func.restype = ctypes.c_int
+        return func
+    except (OSError, AttributeError) as e:
+        logger.debug(f"sendmmsg unavailable, using sendto fallback: {e}")
+        return None
+
+
+_sendmmsg = _load_sendmmsg()
+
 
 class UDPClient:
     """Handles UDP communication with Run8 simulator"""
@@ -30,6 +101,15 @@ class UDPClient:
         self.port = port
         self.sock: Optional[socket.socket] = None
         self.connected = False
+        self._sockaddr: Optional[_SockAddrIn] = None  # Destination for sendmmsg
+        self._target: Tuple[str, int] = (ip, port)  # Resolved destination for sendto
+        # Reused transmit buffer: batches are packed in place, one PACKET per slot
+        self._tx_buf = bytearray(MAX_BATCH_SIZE * PACKET.size)
+        self._tx_view = memoryview(self._tx_buf)
+        self._mmsgs = None  # Prebuilt mmsghdr array pointing into _tx_buf
+        self._tx_cbuf = None  # ctypes view of _tx_buf backing the iovecs
+        self._iovecs = None  # One iovec per _tx_buf slot, referenced by _mmsgs
+        self.dropped_commands = 0  # Packets dropped because the send buffer was full
         
     def connect(self) -> bool:
         """
@@ -40,8 +120,21 @@ class UDPClient:
         """
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.sock.settimeout(1.0)
+            # Never block the caller: a full send buffer drops packets instead
+            self.sock.setblocking(False)
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+            except OSError as e:
+                logger.debug(f"Could not enlarge UDP send buffer: {e}")
+            if sys.platform.startswith('linux') and hasattr(socket, 'IP_TOS'):
+                try:
+                    self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, IP_TOS_LOW_DELAY)
+                except OSError as e:
+                    logger.debug(f"Could not set UDP type-of-service: {e}")
             self.connected = True
+            self._target = self._resolve_target()
+            self._sockaddr = self._build_sockaddr() if _sendmmsg else None
+            self._mmsgs = self._build_mmsgs() if self._sockaddr is not None else None
             logger.info(f"UDP client connected to {self.ip}:{self.port}")
             return True
         except Exception as e:
@@ -60,14 +153,52 @@ class UDPClient:
             finally:
                 self.sock = None
                 self.connected = False
+                self._sockaddr = None
+                self._mmsgs = None
+    
+    def _resolve_target(self) -> Tuple[str, int]:
+        """Resolve the target host once so sendto never does a name lookup per packet"""
+        try:
+            return socket.gethostbyname(self.ip), self.port
+        except (OSError, UnicodeError) as e:
+            logger.debug(f"Could not resolve {self.ip}, sending to it unresolved: {e}")
+            return self.ip, self.port
+    
+    def _build_sockaddr(self) -> Optional[_SockAddrIn]:
+        """Pack the resolved target address into a sockaddr_in for sendmmsg"""
+        try:
+            addr = socket.inet_aton(self._target[0])
+        except OSError as e:
+            logger.debug(f"Could not use {self.ip} for batched sends: {e}")
+            return None
+        sockaddr = _SockAddrIn()
+        sockaddr.sin_family = socket.AF_INET
+        sockaddr.sin_port[0] = (self.port >> 8) & 0xFF
+        sockaddr.sin_port[1] = self.port & 0xFF
+        for i, byte in enumerate(addr):
+            sockaddr.sin_addr[i] = byte
+        return sockaddr
+    
+    def _build_mmsgs(self):
+        """Build the mmsghdr array once; each entry's iovec covers one slot of _tx_buf"""
+        size = PACKET.size
+        self._tx_cbuf = (ctypes.c_char * len(self._tx_buf)).from_buffer(self._tx_buf)
+        base = ctypes.addressof(self._tx_cbuf)
+        self._iovecs = (_IOVec * MAX_BATCH_SIZE)()
+        msgs = (_MMsgHdr * MAX_BATCH_SIZE)()
+        iov_base = ctypes.addressof(self._iovecs)
+        name_ptr = ctypes.addressof(self._sockaddr)
+        name_len = ctypes.sizeof(_SockAddrIn)
+        for i in range(MAX_BATCH_SIZE):
+            self._iovecs[i].iov_base = base + i * size
+            self._iovecs[i].iov_len = size
+            hdr = msgs[i].msg_hdr
+            hdr.msg_name = name_ptr
+            hdr.msg_namelen = name_len
+            hdr.msg_iov = ctypes.cast(iov_base + i * ctypes.sizeof(_IOVec), ctypes.POINTER(_IOVec))
+            hdr.msg_iovlen = 1
+        return msgs
     
-    def _calculate_crc(self, data: bytes) -> int:
-        """Calculate the CRC using XOR as per Run8 protocol spec."""
-        crc = 0
-        for byte in data:
-            crc ^= byte
-        return crc
-
     def send_command(self, function_id: int, value: int, audio: bool = True) -> bool:
         """
         Send a command to Run8 via UDP using the correct 5-byte format.
@@ -85,33 +216,143 @@ class UDPClient:
             return False
         
         try:
-            # Set header based on audio flag
-            header = 224 if audio else 96
-            
-            # Ensure value is a single byte (0-255)
-            value = max(0, min(255, int(value)))
-            
-            # Pack the first 4 bytes (Header, Message Type as ushort, Value)
-            # Format: > (big-endian), B (uchar), H (ushort), B (uchar)
-            message_type = function_id
-            packet_part1 = struct.pack(">BHB", header, message_type, value)
-            
-            # Calculate CRC on the first 4 bytes
-            crc = self._calculate_crc(packet_part1)
-            
-            # Create the final 5-byte packet
-            final_packet = packet_part1 + struct.pack(">B", crc)
-            
-            # Log the packet for debugging if needed
-            # logger.debug(f"Sending packet: {final_packet.hex().upper()}")
-
-            self.sock.sendto(final_packet, (self.ip, self.port))
+            self.sock.sendto(self._build_packet(function_id, value, audio), self._target)
             return True
             
+        except BlockingIOError:
+            self.dropped_commands += 1
+            logger.debug("UDP send buffer full, dropped command")
+            return False
         except Exception as e:
             logger.error(f"Failed to send UDP command: {e}")
             return False
     
+    def _build_packet(self, function_id: int, value: int, audio: bool = True) -> bytes:
+        """Encode a command as the 5-byte Run8 packet (header, ushort type, value, CRC)"""
+        packet = bytearray(PACKET.size)
+        self._pack_packet(packet, 0, function_id, value, audio)
+        return bytes(packet)
+    
+    def _pack_packet(self, buf: bytearray, offset: int, function_id: int, value: int, audio: bool = True) -> None:
+        """Pack one Run8 packet into buf at offset without allocating"""
+        # Set header based on audio flag
+        header = 224 if audio else 96
+        
+        # Ensure value is a single byte (0-255)
+        value = max(0, min(255, int(value)))
+        
+        # XOR CRC over the first 4 bytes (header, ushort hi/lo, value)
+        crc = header ^ (function_id >> 8) ^ (function_id & 0xFF) ^ value
+        PACKET.pack_into(buf, offset, header, function_id, value, crc)
+    
+    def prepare(self, slot: int, function_id: int, value: int, audio: bool = True) -> None:
+        """
+        Pack a command into a transmit slot for the next flush
+        
+        Args:
+            slot: Slot index, 0 <= slot < MAX_BATCH_SIZE
+            function_id: Run8 message type (ushort)
+            value: Value to send (0-255)
+            audio: Whether to include the audio flag in the header.
+        """
+        self._pack_packet(self._tx_buf, slot * PACKET.size, function_id, value, audio)
+    
+    def flush(self, count: int) -> int:
+        """
+        Send transmit slots 0..count-1, one datagram per slot
+        
+        Uses a single sendmmsg syscall on Linux and one sendto per slot elsewhere.
+        
+        Args:
+            count: Number of prepared slots to send (at most MAX_BATCH_SIZE)
+        
+        Returns:
+            Number of packets sent successfully
+        """
+        if not self.sock:
+            logger.warning("UDP socket not connected")
+            return 0
+        
+        if self._mmsgs is not None:
+            return self._sendmmsg_chunk(count)
+        
+        # Portable fallback: one sendto per packet, sliced out of the shared buffer
+        size = PACKET.size
+        view = self._tx_view
+        target = self._target
+        sendto = self.sock.sendto
+        sent = 0
+        for i in range(count):
+            try:
+                sendto(view[i * size:(i + 1) * size], target)
+                sent += 1
+            except BlockingIOError:
+                # Send buffer full: drop the rest of this batch
+                self.dropped_commands += count - i
+                logger.debug(f"UDP send buffer full, dropped {count - i} commands")
+                break
+            except Exception as e:
+                # Stop at the first failure so the sent commands stay a prefix of the batch
+                self.dropped_commands += count - i
+                logger.error(f"Failed to send UDP command, dropped {count - i} commands: {e}")
+                break
+        return sent
+    
+    def send_arrays(self, function_ids: Sequence[int], values: Sequence[int], audio: bool = True) -> int:
+        """
+        Send commands held in parallel sequences, one flush per MAX_BATCH_SIZE chunk
+        
+        Args:
+            function_ids: Run8 message types, one per command
+            values: Values to send (0-255), matching function_ids by position
+            audio: Whether to include the audio flag in every header
+        
+        Returns:
+            Number of commands sent successfully (always a prefix of the input)
+        """
+        if not self.sock:
+            logger.warning("UDP socket not connected")
+            return 0
+        
+        prepare = self.prepare
+        total = len(function_ids)
+        sent = 0
+        for start in range(0, total, MAX_BATCH_SIZE):
+            count = min(MAX_BATCH_SIZE, total - start)
+            try:
+                for slot in range(count):
+                    prepare(slot, function_ids[start + slot], values[start + slot], audio)
+            except Exception as e:
+                logger.error(f"Failed to encode UDP batch: {e}")
+                return sent
+            
+            sent_chunk = self.flush(count)
+            sent += sent_chunk
+            if sent_chunk < count:
+                break
+        return sent
+    
+    def _sendmmsg_chunk(self, count: int) -> int:
+        """Send the first count packets of _tx_buf with sendmmsg"""
+        msgs_addr = ctypes.addressof(self._mmsgs)
+        msg_size = ctypes.sizeof(_MMsgHdr)
+        fd = self.sock.fileno()
+        sent = 0
+        while sent < count:
+            result = _sendmmsg(fd, msgs_addr + sent * msg_size, count - sent, 0)
+            if result < 0:
+                err = ctypes.get_errno()
+                # Drop the rest of this batch either way
+                self.dropped_commands += count - sent
+                if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    logger.debug(f"UDP send buffer full, dropped {count - sent} commands")
+                else:
+                    logger.error(f"Failed to send UDP batch, dropped {count - sent} commands: "
+                                 f"[Errno {err}] {os.strerror(err)}")
+                break
+            sent += result
+        return sent
+    
     def update_connection(self, ip: str, port: int) -> bool:
         """
         Update connection parameters
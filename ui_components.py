@@ -7,7 +7,7 @@ Handles all UI creation, management, and theming for the main application window
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import tkinter.ttk as ttk
-from typing import Dict, List, Callable, Optional, Any
+from typing import Dict, List, Callable, Optional, Any, Sequence, Tuple
 import logging
 
 from config import ThemeConfig, FunctionMapping
@@ -38,6 +38,10 @@ class UIManager:
         self.device_checkboxes: List[tk.Checkbutton] = []
         self.reverse_axis_vars: Dict[str, tk.BooleanVar] = {}
         self.reverse_axis_checkboxes: Dict[str, tk.Checkbutton] = {}  # Store checkbox references
+        self._reverse_axis_restore: Dict[str, bool] = {}  # Reverse states carried across repopulation
+        # Last value pushed to each mapping widget / reverse checkbox, to skip no-op Tk writes
+        self._mapping_display_cache: Dict[str, str] = {}
+        self._reverse_display_cache: Dict[str, bool] = {}
         # Can be tk.Label or tk.Entry (readonly)
         self.mapping_labels: Dict[str, Any] = {}
         self.mapping_buttons: Dict[str, tk.Button] = {}
@@ -66,6 +70,7 @@ class UIManager:
         self.on_map_input_callback: Optional[Callable] = None
         self.on_clear_mapping_callback: Optional[Callable] = None
         self.on_cancel_mapping_callback: Optional[Callable] = None
+        self.on_reverse_axis_callback: Optional[Callable] = None
         self.reverser_mode_callback = None
 
         # Throttle mode state: 'separate', 'toggle', 'split'
@@ -497,7 +502,7 @@ class UIManager:
             self.device_vars.append(var)
             self.device_checkboxes.append(checkbox)
     
-    def populate_mapping_interface(self, functions: List[str], mapping_data: Optional[dict] = None) -> None:
+    def populate_mapping_interface(self, functions: Sequence[str], mapping_data: Optional[dict] = None) -> None:
         """
         Populate the mapping interface with function controls
         Args:
@@ -505,7 +510,7 @@ class UIManager:
             mapping_data: Optional dict mapping function names to mapping text (for restoring UI)
         """
         # Store the last-used function list for UI refreshes
-        self._last_functions_list = functions.copy()
+        self._last_functions_list = list(functions)
 
         # Save current mapping display so we can restore it after UI refresh
         current_mapping_display = {}
@@ -514,10 +519,15 @@ class UIManager:
                 val = widget.get()
                 current_mapping_display[fn] = val if val else "Not mapped"
 
+        # Save reverse checkbox states so the rebuilt checkboxes keep them
+        self._reverse_axis_restore = {fn: var.get() for fn, var in self.reverse_axis_vars.items()}
+
         # Clear existing mappings
         self.mapping_labels.clear()
         self.mapping_buttons.clear()
         self.reverse_axis_vars.clear()
+        self._mapping_display_cache.clear()
+        self._reverse_display_cache.clear()
 
         # Clear category frames
         for frame in self.category_frames.values():
@@ -604,11 +614,12 @@ class UIManager:
             reverse_var = None
             reverse_checkbox = None
             if input_type == 'lever':
-                reverse_var = tk.BooleanVar()
+                reverse_var = tk.BooleanVar(value=self._reverse_axis_restore.get(function_name, False))
                 reverse_checkbox = tk.Checkbutton(
                     func_frame,
                     text="Reverse",
                     variable=reverse_var,
+                    command=lambda fn=function_name: self._on_reverse_axis_change(fn),
                     bg="#444444",
                     fg=self.theme.DARK_FG,
                     activebackground="#666666",
@@ -770,11 +781,12 @@ class UIManager:
             self.mapping_labels[function_name] = status_label
 
             # Add reverse checkbox for throttle lever
-            reverse_var = tk.BooleanVar()
+            reverse_var = tk.BooleanVar(value=self._reverse_axis_restore.get(function_name, False))
             reverse_checkbox = tk.Checkbutton(
                 func_frame,
                 text="Reverse",
                 variable=reverse_var,
+                command=lambda fn=function_name: self._on_reverse_axis_change(fn),
                 bg="#444444",
                 fg=self.theme.DARK_FG,
                 activebackground="#666666",
@@ -921,11 +933,12 @@ class UIManager:
 
         input_type = FunctionMapping.INPUT_TYPES.get(function_name, 'toggle')
         if input_type == 'lever':
-            reverse_var = tk.BooleanVar()
+            reverse_var = tk.BooleanVar(value=self._reverse_axis_restore.get(function_name, False))
             reverse_checkbox = tk.Checkbutton(
                 func_frame,
                 text="Reverse",
                 variable=reverse_var,
+                command=lambda fn=function_name: self._on_reverse_axis_change(fn),
                 bg="#444444",
                 fg=self.theme.DARK_FG,
                 activebackground="#666666",
@@ -974,6 +987,9 @@ class UIManager:
     def update_mapping_display(self, function_name: str, mapping_text: str) -> None:
         """Update the display text for a function mapping"""
         if function_name in self.mapping_labels:
+            if self._mapping_display_cache.get(function_name) == mapping_text:
+                return  # Widget already shows this text
+            self._mapping_display_cache[function_name] = mapping_text
             widget = self.mapping_labels[function_name]
             if isinstance(widget, tk.Entry):
                 # 'readonly' is a valid state for tk.Entry, but not recognized by type checker
@@ -984,6 +1000,28 @@ class UIManager:
             else:
                 widget.config(text=mapping_text)
     
+    def update_mapping_displays_bulk(self, rows: Dict[str, Tuple[str, Optional[bool]]]) -> Dict[str, Exception]:
+        """Apply a whole refresh of mapping rows in one pass
+        
+        Args:
+            rows: Function name -> (display text, reverse checkbox state or None to leave it)
+            
+        Returns:
+            Function name -> error, for rows whose widgets could not be updated
+        """
+        update_display = self.update_mapping_display
+        set_reverse = self.set_reverse_axis_setting
+        errors: Dict[str, Exception] = {}
+        for function_name, (mapping_text, reverse) in rows.items():
+            # Guard each row on its own so one bad widget can't blank the rest
+            try:
+                update_display(function_name, mapping_text)
+                if reverse is not None:
+                    set_reverse(function_name, reverse)
+            except Exception as e:
+                errors[function_name] = e
+        return errors
+    
     def set_mapping_prompt(self, text: str) -> None:
         """Set the mapping prompt text"""
         if self.mapping_prompt:
@@ -1027,9 +1065,19 @@ class UIManager:
             return self.reverse_axis_vars[function_name].get()
         return False
     
+    def _on_reverse_axis_change(self, function_name: str) -> None:
+        """Handle a user click on a reverse checkbox"""
+        reverse = self.get_reverse_axis_setting(function_name)
+        self._reverse_display_cache[function_name] = reverse
+        if self.on_reverse_axis_callback:
+            self.on_reverse_axis_callback(function_name, reverse)
+    
     def set_reverse_axis_setting(self, function_name: str, reverse: bool) -> None:
         """Set the reverse axis setting for a function"""
         if function_name in self.reverse_axis_vars:
+            if self._reverse_display_cache.get(function_name) == reverse:
+                return  # Checkbox already in this state
+            self._reverse_display_cache[function_name] = reverse
             self.reverse_axis_vars[function_name].set(reverse)
     
     def enable_start_button(self) -> None:
@@ -1119,6 +1167,14 @@ class UIManager:
         """Set the map input callback"""
         self.on_map_input_callback = callback
     
+    def trace_throttle_mode_var(self, callback: Callable) -> None:
+        """Call callback() whenever the throttle mode variable is written"""
+        self.throttle_mode_var.trace_add('write', lambda *_: callback())
+    
+    def set_reverse_axis_callback(self, callback: Callable) -> None:
+        """Set the reverse axis checkbox callback"""
+        self.on_reverse_axis_callback = callback
+    
     def set_clear_mapping_callback(self, callback: Callable) -> None:
         """Set the clear mapping callback"""
         self.on_clear_mapping_callback = callback
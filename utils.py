@@ -4,72 +4,84 @@ Utility functions and helpers for Run8 Control Conductor
 Contains common utility functions, constants, and helper classes.
 """
 
+import ctypes
+import functools
 import os
+import queue
+import sys
 import time
 import threading
 from typing import Any, Callable, Optional
 import logging
+import logging.handlers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Whether timeBeginPeriod(1) is currently in effect (Windows only)
+_timer_resolution_raised = False
 
-class PeriodicTimer:
-    """A periodic timer that runs a function at regular intervals"""
+
+def begin_high_resolution_timer() -> None:
+    """Raise the Windows scheduler timer resolution to 1 ms; no-op elsewhere or if already raised"""
+    global _timer_resolution_raised
+    if sys.platform != 'win32' or _timer_resolution_raised:
+        return
+    try:
+        if ctypes.windll.winmm.timeBeginPeriod(1) == 0:  # TIMERR_NOERROR
+            _timer_resolution_raised = True
+            logger.debug("Raised Windows timer resolution to 1 ms")
+    except (OSError, AttributeError) as e:
+        logger.warning(f"Could not raise Windows timer resolution: {e}")
+
+
+def end_high_resolution_timer() -> None:
+    """Release the 1 ms timer resolution requested by begin_high_resolution_timer"""
+    global _timer_resolution_raised
+    if not _timer_resolution_raised:
+        return
+    try:
+        ctypes.windll.winmm.timeEndPeriod(1)
+        logger.debug("Restored default Windows timer resolution")
+    except (OSError, AttributeError) as e:
+        logger.warning(f"Could not restore Windows timer resolution: {e}")
+    finally:
+        _timer_resolution_raised = False
+
+
+def pin_current_thread(cpu: Optional[int] = None) -> bool:
+    """
+    Pin the calling thread to one CPU (Linux only; a no-op elsewhere)
     
-    def __init__(self, interval: float, function: Callable, *args, **kwargs):
-        """
-        Initialize the periodic timer
-        
-        Args:
-            interval: Time interval in seconds
-            function: Function to call periodically
-            *args: Arguments to pass to the function
-            **kwargs: Keyword arguments to pass to the function
-        """
-        self.interval = interval
-        self.function = function
-        self.args = args
-        self.kwargs = kwargs
-        self.timer: Optional[threading.Timer] = None
-        self.running = False
-    
-    def start(self) -> None:
-        """Start the periodic timer"""
-        if not self.running:
-            self.running = True
-            self._run()
-            logger.debug(f"Started periodic timer with interval {self.interval}s")
-    
-    def stop(self) -> None:
-        """Stop the periodic timer"""
-        self.running = False
-        if self.timer:
-            self.timer.cancel()
-            self.timer = None
-            logger.debug("Stopped periodic timer")
-    
-    def _run(self) -> None:
-        """Internal method to run the timer"""
-        if self.running:
-            try:
-                self.function(*self.args, **self.kwargs)
-            except Exception as e:
-                logger.error(f"Error in periodic timer function: {e}")
-            
-            if self.running:
-                self.timer = threading.Timer(self.interval, self._run)
-                self.timer.start()
+    Args:
+        cpu: CPU to pin to; defaults to the highest CPU the process may run on
     
-    def is_running(self) -> bool:
-        """Check if the timer is running"""
-        return self.running
+    Returns:
+        True if the thread was pinned, False otherwise
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        allowed = os.sched_getaffinity(0)
+        if cpu is None:
+            if len(allowed) < 2:
+                return False  # Pinning a single-CPU process gains nothing
+            cpu = max(allowed)
+        # On Linux, pid 0 means the calling thread, not the whole process
+        os.sched_setaffinity(0, {cpu})
+        logger.debug(f"Pinned thread {threading.current_thread().name} to CPU {cpu}")
+        return True
+    except OSError as e:
+        logger.debug(f"Could not pin thread to CPU {cpu}: {e}")
+        return False
 
 
 class StateTracker:
     """Tracks state changes for input processing"""
     
+    __slots__ = ('states', 'last_change_time')
+    
     def __init__(self):
         """Initialize the state tracker"""
         self.states = {}
@@ -197,9 +209,10 @@ def get_log_dir() -> str:
     return log_dir
 
 
+@functools.lru_cache(maxsize=512)
 def format_input_display(device_id: int, input_type: str, input_index: int) -> str:
     """
-    Format input mapping for display
+    Format input mapping for display (memoized; the result depends only on the arguments)
     
     Args:
         device_id: Device ID
@@ -286,14 +299,22 @@ def safe_float_convert(value: str, default: float = 0.0) -> float:
         return default
 
 
+# Background listener that performs the actual log I/O (see setup_logging)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
 def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> None:
     """
     Setup application logging
     
+    Records are put on a queue by the calling thread and written by a
+    background QueueListener, so logging never blocks the Tk or poll threads.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional log file path
     """
+    global _log_listener
     log_level = getattr(logging, level.upper(), logging.INFO)
     
     # Create formatter
@@ -315,16 +336,31 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> None:
         except Exception as e:
             logger.warning(f"Failed to setup file logging: {e}")
     
-    # Configure logging
+    # Replace any earlier listener (and the modules' import-time basicConfig handlers)
+    shutdown_logging()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Only merge args into the message here; the listener's handlers apply the real format
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
     logging.basicConfig(
         level=log_level,
-        handlers=handlers,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        handlers=[queue_handler],
+        force=True
     )
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
     
     logger.info(f"Logging setup complete - Level: {level}")
 
 
+def shutdown_logging() -> None:
+    """Flush queued log records and stop the background listener"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
 class ConfigurationError(Exception):
     """Custom exception for configuration errors"""
     pass